@@ -0,0 +1,182 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This Board class draws the game window in retained mode.
+# The rules panel and grid lines are drawn once onto a cached
+# background, then each frame only the tiles and clock that
+# changed since the last frame are redrawn and their rects are
+# handed back for pygame.display.update(rects)
+#############################################################
+import pygame
+import utilities
+from GlyphAtlas import GlyphAtlas
+from Grid import DIGITS
+
+
+class Board:
+    """
+    The Board class keeps the game window drawn and reports which parts of it changed
+
+    Attributes
+    ----------
+        self.display : display
+            pygame display
+
+        self.play : play
+            the Play class whose tiles are drawn
+
+        self.background : Surface
+            the rules text and grid lines, drawn once and copied back under anything that changes
+
+        self.states : list
+            the last drawn Tile.state() of every tile
+
+        self.clock_text : None
+            the last clock string drawn
+
+        self.clock_rect : None
+            where the last clock was drawn
+
+        self.full_redraw : True
+            set when the whole window has to be drawn on the next frame
+
+        self.allocations : 0
+            debug counter of surfaces created while drawing the last frame
+
+        self.popup : None
+            a Popup drawn on top of the game, like the end of game message
+
+        self.popup_drawn : False
+            set once the popup is on screen so it is only redrawn when something under it changes
+
+    Methods
+    -------
+        def __init__():
+            builds the cached background
+
+        def build_background():
+            draws the rules and the grid lines for the play's board size
+
+        def draw_rules():
+            writes the game rules to a surface
+
+        def set_play():
+            switches to a new game and redraws everything
+
+        def show_popup():
+            puts a Popup on top of the game
+
+        def hide_popup():
+            takes the popup away and redraws the window under it
+
+        def draw():
+            redraws only what changed and returns the rects to update
+    """
+    CLOCK_POS = (680, 400)
+
+    def __init__(self, display, play):
+        self.display = display
+        self.play = play
+        self.clock_font = pygame.font.Font("fonts/Futura.ttf", 32)
+        self.build_background()
+        self.states = [[None] * play.col for _ in range(play.row)]
+        self.clock_text = None
+        self.clock_rect = None
+        self.full_redraw = True
+        self.allocations = 0
+        self.popup = None
+        self.popup_drawn = False
+
+    def build_background(self):
+        self.background = pygame.Surface(self.display.get_size()).convert()
+        self.background.fill((0, 0, 0))
+        self.draw_rules(self.background)
+        self.play.draw_lines(self.background)
+
+    def draw_rules(self, window):
+        # overlays texts that explains how to play the game
+        # digits run 1-9 on a 9x9 board and on into letters for the bigger ones
+        digits = f"1-{DIGITS[self.play.size - 1]}"
+        box = f"{self.play.box}x{self.play.box}"
+        font = pygame.font.Font("fonts/Futura.ttf", 28)
+        text = font.render("SUDOKU RULES", 1, (255, 255, 0))
+        window.blit(text, (540+130,100))
+        font = pygame.font.Font("fonts/Futura.ttf", 16)
+        text = font.render(f"1. Each row must contain the numbers {digits} exactly once each",1, (255, 128, 0))
+        window.blit(text, (540+10 ,140))
+        text = font.render(f"2. Each column must contain the numbers {digits} exactly once each", 1, (255, 0, 0))
+        window.blit(text, (540+10 ,160))
+        text = font.render(f"3. Each {box} play must contain the numbers {digits} exactly once each",1, (255, 0, 127))
+        window.blit(text, (540+10 ,180))
+        font = pygame.font.Font("fonts/Futura.ttf", 28)
+        text = font.render("GAME PLAY", 1, (255, 0, 255))
+        window.blit(text, (540+150,245))
+        font = pygame.font.Font("fonts/Futura.ttf", 18)
+        text = font.render("Select a blank tile to play a value", 1, (127, 0, 255))
+        window.blit(text, (540+30,280))
+        text = font.render("Press ENTER to set the value in the display", 1, (0, 0, 255))
+        window.blit(text, (540+30,300))
+        text = font.render("Press BACKSPACE to remove the value and try again", 1, (0, 127,255))
+        window.blit(text, (540+30,320))
+        text = font.render("Press P or TAB to show or hide pencil marks", 1, (0, 255,255))
+        window.blit(text, (540+30,340))
+
+    def set_play(self, play):
+        # a board of another size needs its own grid lines and rules
+        resized = play.size != self.play.size
+        self.play = play
+        if resized:
+            self.build_background()
+        self.full_redraw = True
+
+    def show_popup(self, popup):
+        self.popup = popup
+        self.popup_drawn = False
+
+    def hide_popup(self):
+        self.popup = None
+        self.full_redraw = True
+
+    def draw(self, time):
+        allocations = GlyphAtlas.allocations
+        rects = []
+        if self.full_redraw:
+            self.display.blit(self.background, (0, 0))
+            self.states = [[None] * self.play.col for _ in range(self.play.row)]
+            self.clock_text = None
+            rects.append(self.display.get_rect())
+
+        for row in self.play.tiles:
+            for tile in row:
+                state = tile.state()
+                if state == self.states[tile.row][tile.col]:
+                    continue
+                # put the background (and grid lines) back under the tile then draw it fresh
+                rect = tile.rect()
+                self.display.blit(self.background, rect, rect)
+                tile.draw(self.display)
+                self.states[tile.row][tile.col] = state
+                rects.append(rect)
+
+        # the clock text only changes once a second
+        clock_text = "Clock " + utilities.set_time(time)
+        if clock_text != self.clock_text:
+            if self.clock_rect:
+                self.display.blit(self.background, self.clock_rect, self.clock_rect)
+                rects.append(self.clock_rect)
+            text = self.clock_font.render(clock_text, 1, (0, 255, 255))
+            GlyphAtlas.count()
+            self.clock_rect = self.display.blit(text, self.CLOCK_POS)
+            self.clock_text = clock_text
+            rects.append(self.clock_rect)
+
+        # anything redrawn under the popup would cover it, so put it back on top
+        if self.popup and (not self.popup_drawn or self.popup.rect.collidelist(rects) != -1):
+            rects.append(self.popup.draw(self.display))
+            self.popup_drawn = True
+
+        self.full_redraw = False
+        self.allocations = GlyphAtlas.allocations - allocations
+        return rects
@@ -0,0 +1,94 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This GlyphAtlas class pre-renders every digit in every tile
+# colour and builds the highlight and selection overlays once
+# so drawing a tile is only blits. One atlas is shared by all
+# tiles of the same size.
+#############################################################
+import pygame
+from Grid import DIGITS
+
+
+class GlyphAtlas:
+    """
+    The GlyphAtlas class holds the pre-rendered digits and overlays the tiles blit from
+
+    Attributes
+    ----------
+        atlases : {}
+            every atlas built so far, shared across all tiles and boards
+
+        allocations : 0
+            debug counter of surfaces created by the atlas and anything else
+            that calls count(), the Board reports how much it goes up per frame
+
+        self.glyphs : dict
+            the rendered digit surface for each (digit, color), 10 and up are
+            drawn as the letters from Grid.DIGITS
+
+        self.marks : dict
+            the small pencil mark surface for each digit
+
+        self.highlight : Surface
+            a see through tile sized square for the highlighted row and column
+
+        self.selection : Surface
+            the tile sized green border for the selected tile
+
+    Methods
+    -------
+        def get():
+            returns the shared atlas for a tile size and colors, building it the first time
+
+        def count():
+            adds to the allocation counter
+
+        def __init__():
+            renders the digits and builds the overlays
+
+        def glyph():
+            returns the rendered surface for a digit in a color
+    """
+    atlases = {}
+    allocations = 0
+
+    @classmethod
+    def get(cls, space, colors, highlight, selection, mark_color, digits=9, font_name="fonts/Futura.ttf", font_size=26):
+        key = (space, tuple(colors), tuple(highlight), tuple(selection), tuple(mark_color), digits, font_name, font_size)
+        if key not in cls.atlases:
+            cls.atlases[key] = cls(space, colors, highlight, selection, mark_color, digits, font_name, font_size)
+        return cls.atlases[key]
+
+    @classmethod
+    def count(cls, amount=1):
+        cls.allocations += amount
+
+    def __init__(self, space, colors, highlight, selection, mark_color, digits, font_name, font_size):
+        font = pygame.font.Font(font_name, font_size)
+        self.glyphs = {}
+        for color in colors:
+            for digit in range(1, digits + 1):
+                self.glyphs[(digit, tuple(color))] = font.render(DIGITS[digit - 1], 1, color)
+                self.count()
+
+        # pencil marks are laid out box by box in the tile, so on a 9x9 board
+        # they share it with up to 8 others and are half size
+        box = int(round(digits ** 0.5))
+        font = pygame.font.Font(font_name, max(1, font_size * 3 // (box * 2)))
+        self.marks = {}
+        for digit in range(1, digits + 1):
+            self.marks[digit] = font.render(DIGITS[digit - 1], 1, mark_color)
+            self.count()
+
+        size = pygame.Rect(0, 0, space, space).size
+        self.highlight = pygame.Surface(size, pygame.SRCALPHA)
+        self.highlight.fill(highlight)
+        self.selection = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(self.selection, selection, self.selection.get_rect(), 3)
+        self.count(2)
+
+    def glyph(self, digit, color):
+        return self.glyphs[(digit, tuple(color))]
@@ -6,21 +6,99 @@
 # This Grid class contains all of the logic to set up
 # the sudoku game board with values 1-9 exactly once
 # in each row, column and 3x3 block 
+# (or 1-G in 4x4 blocks for 16x16, 1-P in 5x5 blocks for 25x25)
 # it build a randomly generated sudoku solution
-# then randomly deletes a set number of values from the solution
+# then deletes values from the solution one at a time, keeping
+# each blank only while the puzzle still has a single solution
+# the board is filled and solved by the bitset Solver engine,
+# the original backtracking engine is kept for comparison
 #############################################################
-from random import randint
+from random import Random
 import copy
-from rich import print
+import time
+from Solver import Solver
+
+# clues left on a 9x9 board and the least number of guesses the Solver has
+# to make to prove the answer is unique before a puzzle counts as that difficulty
+# bigger boards keep the same share of clues, see Grid.clues()
+DIFFICULTY = {
+    "easy": {"clues": 49, "rating": 0},
+    "medium": {"clues": 32, "rating": 0},
+    "hard": {"clues": 24, "rating": 2},
+}
+
+# seconds build_grid may spend digging a puzzle for each inner box width
+# a 9x9 board is interactive, 16x16 stays under a couple of seconds and
+# 25x25 stops digging at its budget and keeps the clues it has left
+TIME_BUDGET = {3: 1.0, 4: 2.0, 5: 10.0}
+
+# search nodes a single uniqueness check may use on the bigger boards before
+# the blank is given up on, so one unlucky check can't eat the whole budget
+NODE_LIMIT = {3: None, 4: 500, 5: 500}
+
+# digits as they are written in a one line puzzle, '.' is a blank tile
+# 10 and up are letters so every digit is one character up to 25x25
+DIGITS = "123456789ABCDEFGHIJKLMNOP"
+
+
+def to_line(board):
+    # writes a board row by row as a single string like "53..7...."
+    return "".join(DIGITS[v - 1] if v else "." for row in board for v in row)
+
+
+def from_line(line):
+    # reads a board written by to_line, '0' is accepted as a blank too
+    line = line.strip()
+    size = int(len(line) ** 0.5)
+    values = [0 if ch in ".0" else DIGITS.index(ch) + 1 for ch in line]
+    return [values[r * size:(r + 1) * size] for r in range(size)]
 
 class Grid:
     """
-    The Grid class builds a 9x9 game board layout in the pygame window and fills the grid with randomly generated values 1-9 for the sudoku game
+    The Grid class builds a 9x9 (or 16x16, 25x25) game board layout in the pygame window and fills the grid with randomly generated values 1-9 for the sudoku game
 
     Attributes
     ----------
         self.grid : 
         
+        self.engine : "bitset"
+            which engine fills and solves the board, "bitset" for the Solver class
+            or "classic" for the original backtracking methods
+
+        self.rng : Random(seed)
+            random generator so a board can be rebuilt from its seed
+
+        self.difficulty : "easy"
+            key into DIFFICULTY for the clue count and rating to aim for
+
+        self.symmetric : False
+            removes clues in mirrored pairs so the puzzle is rotationally symmetric
+
+        self.box : 3
+            width of an inner box, 3 for 9x9, 4 for 16x16 and 5 for 25x25
+            inferred from the puzzle when one is given
+
+        self.size, self.cells : 9, 81
+            rows (and digits) on the board and the number of tiles
+
+        self.time_budget : TIME_BUDGET[box]
+            seconds build_grid may spend looking for a puzzle of the right rating
+
+        self.rating : 0
+            guesses needed to prove the finished puzzle is unique
+
+        self.gen_time : 0
+            seconds the last build_grid took
+
+        self.nodes, self.backtracks : 0
+            search calls and backtracks of the last bitset fill_tiles or solve
+
+        puzzle, solution : None
+            an already generated board and its answer, build_grid is skipped when given
+
+        instrument : None
+            an Instrument to attach before the board is built, so generation is counted too
+
         self.build_grid() :
 
     Methods 
@@ -30,20 +108,40 @@ class Grid:
         
         def build_grid() : 
             fills each tile with 1-9 values
-            leaves 32 squares blank to play the game
+            leaves blank squares to play the game based on the difficulty
+            and records how long it took in gen_time
             
+        def clues() :
+            the clues to leave for the difficulty, scaled to the board size
+
         def get_sol() :
             gets a copy of the sudoku solution
         
         def fill_tiles() :
+            fills the board with a random solution using the chosen engine
+
+        def backtrack_fill() :
             tags the tiles with their respective randomly generated values
             checks that column and rows are okay to fill such values 
         
         def delete_items() : 
+            blanks tiles in a shuffled order, keeping a blank only if the 
+            puzzle still has exactly one solution
+
+        def random_delete() : 
             indexes all rows and columns with each 1-9 value
             determines which tiles to to leave blank 
+
+        def rate() : 
+            rates the puzzle by the guesses the Solver needs to finish it
+
+        def new_solver() : 
+            makes a Solver for the current board
             
         def solve() : 
+            solves the sudoku grid using the chosen engine
+
+        def backtrack_solve() : 
             solves the sudoku grid before choosing which tiles to leave blank
             
         def row_OK() :
@@ -63,24 +161,90 @@ class Grid:
         def find_blank() : 
             finds the blank tiles to leave empty for the user to play the game
         """
-    def __init__(self):
-        self.grid = [[0] * 9 for _ in range(9)]
-        self.build_grid()
+    def __init__(self, engine="bitset", seed=None, difficulty="easy", symmetric=False, time_budget=None,
+                 puzzle=None, solution=None, instrument=None, box=3):
+        self.engine = engine
+        self.seed = seed
+        self.rng = Random(seed)
+        self.difficulty = difficulty
+        self.symmetric = symmetric
+        if puzzle is not None:
+            box = int(round(len(puzzle) ** 0.5))
+        self.box = box
+        self.size = box * box
+        self.cells = self.size * self.size
+        self.time_budget = time_budget if time_budget is not None else TIME_BUDGET.get(box, 10.0)
+        self.rating = 0
+        self.gen_time = 0
+        self.nodes = 0
+        self.backtracks = 0
+        if instrument is not None:
+            instrument.attach(self)
+        if puzzle is not None:
+            self.grid = copy.deepcopy(puzzle)
+            self.solution = copy.deepcopy(solution)
+        else:
+            self.grid = [[0] * self.size for _ in range(self.size)]
+            self.build_grid()
 
 
     def build_grid(self):
+        if self.engine == "classic" and self.box != 3:
+            # random retries stall long before a 16x16 board is full
+            raise ValueError("the classic engine only builds 9x9 boards, use the bitset engine")
+        start = time.perf_counter()
         self.fill_tiles()
         self.solution = copy.deepcopy(self.grid)
         #print(self.solution)
         # sets the number of tiles to leave blank
-        self.delete_items(32)
+        target = DIFFICULTY[self.difficulty]
+        blanks = self.cells - self.clues()
+        if self.engine == "classic":
+            self.random_delete(blanks)
+        else:
+            # keep digging fresh puzzles out of the same solution until one is
+            # hard enough or the time budget runs out, then keep the hardest
+            deadline = start + self.time_budget
+            best = None
+            while True:
+                self.grid = copy.deepcopy(self.solution)
+                self.delete_items(blanks, deadline)
+                self.rating = self.rate()
+                if best is None or self.rating > best[0]:
+                    best = (self.rating, self.grid)
+                if self.rating >= target["rating"] or time.perf_counter() > deadline:
+                    break
+            self.rating, self.grid = best
+        self.gen_time = time.perf_counter() - start
         
+    def clues(self):
+        return round(DIFFICULTY[self.difficulty]["clues"] * self.cells / 81)
+
     def get_sol(self):
         return self.solution
         
     def fill_tiles(self):
+        if self.engine == "classic":
+            return self.backtrack_fill()
+        # the boxes on the diagonal share no row or column so they can
+        # be shuffled freely, then the Solver fills the rest in a random order
+        box = self.box
+        for b in range(box):
+            digits = list(range(1, self.size + 1))
+            self.rng.shuffle(digits)
+            for k in range(self.size):
+                self.grid[b * box + k // box][b * box + k % box] = digits[k]
+        solver = self.new_solver(rng=self.rng)
+        solved = solver.solve(randomize=True)
+        self.nodes, self.backtracks = solver.nodes, solver.backtracks
+        if not solved:
+            return False
+        self.grid = solver.to_grid()
+        return True
+
+    def backtrack_fill(self):
         #set the tag to false for _ from 0-8
-        tag = [False for _ in range(9)]
+        tag = [False for _ in range(self.size)]
         #set blank = to the find_blank() function
         blank = self.find_blank()
         # if blank is none return true
@@ -91,7 +255,7 @@ class Grid:
         #while this is true
         while True:
             #num is given random integer bewteen 1-9
-            num = randint(1,9)
+            num = self.rng.randint(1, self.size)
             #tag[num-1] is set to True
             tag[num - 1] = True
             #if its OK_to fill, the row and column with that number
@@ -99,44 +263,92 @@ class Grid:
                 #set the number equal to the row and column on the grid
                 self.grid[row][col] = num
                 #if youn can fill the tile
-                if self.fill_tiles():
+                if self.backtrack_fill():
                     #return true
                     return True
                 #otherwise the row and column on the grid is 0
                 self.grid[row][col] = 0
             #if the tag count is true, its equal to 9 
-            if tag.count(True) == 9:
+            if tag.count(True) == self.size:
                 #otherwise its false
                 return False
 
-    def delete_items(self, count):
+    def delete_items(self, count, deadline=None):
+        # try every tile once in a shuffled order (in mirrored pairs when
+        # symmetric) and undo any blank that lets in a second solution
+        order = list(range(self.cells))
+        self.rng.shuffle(order)
+        last = self.size - 1
+        for index in order:
+            if count <= 0 or (deadline is not None and time.perf_counter() > deadline):
+                break
+            row, col = index // self.size, index % self.size
+            tiles = {(row, col), (last - row, last - col)} if self.symmetric else {(row, col)}
+            tiles = [(r, c) for r, c in tiles if self.grid[r][c] != 0]
+            if not tiles or len(tiles) > count:
+                continue
+            for r, c in tiles:
+                self.grid[r][c] = 0
+            # the counter stops at 2, we only need to know it isn't unique
+            solver = self.new_solver()
+            solver.node_limit = NODE_LIMIT.get(self.box)
+            if solver.count_solutions(2) == 1:
+                count -= len(tiles)
+            else:
+                for r, c in tiles:
+                    self.grid[r][c] = self.solution[r][c]
+        # the number of blanks that couldn't be made
+        return count
+
+    def random_delete(self, count):
         # while the count is not equal to zero
         while count != 0:
             # set the index to a random int between 0-80 
-            index = randint(0, 80)
+            index = self.rng.randint(0, self.cells - 1)
             # set the row and column to the index/9 
-            row, col  = int(index / 9), index % 9
+            row, col  = int(index / self.size), index % self.size
             while self.grid[row][col - 1 if col != 0 else col] == 0:
-                index = randint(0, 80)
-                row, col = int(index / 9), index % 9 - 1
+                index = self.rng.randint(0, self.cells - 1)
+                row, col = int(index / self.size), index % self.size - 1
             self.grid[row][col - 1 if col != 0 else col] = 0
             #decrement the count
             count -= 1
 
+    def new_solver(self, rng=None):
+        # every Solver the Grid uses is made here so Instrument can hook them
+        return Solver(self.grid, box=self.box, rng=rng)
+
+    def rate(self):
+        # on the bigger boards a rating that hits NODE_LIMIT is only a lower bound
+        solver = self.new_solver()
+        solver.node_limit = NODE_LIMIT.get(self.box)
+        return solver.rating()
+
     def solve(self):
+        if self.engine == "classic":
+            return self.backtrack_solve()
+        solver = self.new_solver()
+        solved = solver.solve()
+        self.nodes, self.backtracks = solver.nodes, solver.backtracks
+        if not solved:
+            return False
+        self.grid = solver.to_grid()
+        return True
+
+    def backtrack_solve(self):
         #set blank = to the find_blank() function
         blank = self.find_blank()
         if blank is None:
             #print("solve blank T")
             return True
         row, col = blank[0], blank[1]
-        for num in range(1,10):
+        for num in range(1, self.size + 1):
             #check if the row, col, number from OK_to_fill function
             if self.OK_to_fill(row, col, num):
                 #set the grid's row and column to the number 
                 self.grid[row][col] = num
                 #recursive call to solve again
-                if self.solve():
+                if self.backtrack_solve():
                     #print("solve T")
                     return True
                 self.grid[row][col] = 0
@@ -145,7 +357,7 @@ class Grid:
 
     def row_OK(self, row, num):
         #for the 9 rows
-        for i in range(9):
+        for i in range(self.size):
             #if the grids coloumns are equal to the number
             if self.grid[row][i] == num:
                 #print("row_OK F")
@@ -155,7 +367,7 @@ class Grid:
 
     def col_OK(self, col, num):
         #for the 9 columns
-        for i in range(9):
+        for i in range(self.size):
             #if the grids coloumns are equal to the number 
             if self.grid[i][col] == num:
                 #print("col_OK F")
@@ -165,9 +377,9 @@ class Grid:
 
     def mid_tiles_OK(self, row, col, num):
         # for the 3 rows
-        for i in range(3):
+        for i in range(self.box):
             # for the 3 colummns
-            for j in range(3):
+            for j in range(self.box):
                 #if the grid's row + (0,1,2) and col + (0,1,2) is equal to the value
                 if self.grid[row + i][col + j] == num:
                     #print("mid_tiles_OK F")
@@ -178,13 +390,13 @@ class Grid:
     def OK_to_fill(self, row, col, num):
         #return the value in the row and the value in the col 
         #and the values in the row and col of the 3x3 section
-        return self.row_OK(row, num) and                                                                self.col_OK(col, num) and                                                                   self.mid_tiles_OK(row - row % 3, col - col % 3, num)      
+        return self.row_OK(row, num) and                                                                self.col_OK(col, num) and                                                                   self.mid_tiles_OK(row - row % self.box, col - col % self.box, num)      
             
     def find_blank(self):
         #for the 9 rows
-        for i in range(9):
+        for i in range(self.size):
             #for the 9 columns
-            for j in range(9):
+            for j in range(self.size):
                 #if the row and col = 0
                 if self.grid[i][j] == 0:
                     #return the row and col
@@ -0,0 +1,187 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This Instrument class counts how much work the Grid engines
+# do. Attaching it wraps the Grid's (and its Solvers') methods
+# on that one object only, so a Grid without an Instrument
+# runs the plain class methods and pays nothing for it.
+#
+# trace events are stored 3 numbers at a time:
+#   event, tile index (row * size + col), digit
+# event 0 is a digit placed, 1 a digit taken back and 2 a
+# dead end at a blank tile
+#############################################################
+from array import array
+import time
+
+
+class Instrument:
+    """
+    The Instrument class wraps a Grid to count nodes, backtracks and constraint checks
+
+    Attributes
+    ----------
+        self.nodes : 0
+            search calls, classic backtrack_fill/backtrack_solve or Solver.search
+
+        self.backtracks : 0
+            search calls that hit a dead end and returned False
+
+        self.checks : 0
+            constraint checks, classic OK_to_fill or Solver.candidates
+
+        self.calls : dict
+            [number of calls, total seconds] for each top level Grid method
+
+        self.trace : None
+            array of (event, tile, digit) numbers when tracing is on
+
+    Methods
+    -------
+        def __init__():
+            starts the counters, trace=True keeps a search trace
+
+        def attach():
+            wraps the Grid's methods on that instance
+
+        def detach():
+            puts the Grid's own methods back
+
+        def attach_solver():
+            wraps a Solver made by the Grid
+
+        def timed():
+            wraps a method to count its calls and wall time
+
+        def report():
+            the counters as a dict
+
+        def dump():
+            writes the trace to a file one event per line
+    """
+    PLACE = 0
+    REMOVE = 1
+    DEAD_END = 2
+    EVENTS = "prd"
+    # the Grid methods that get a call count and wall time
+    TIMED = ("build_grid", "fill_tiles", "delete_items", "solve", "rate")
+
+    def __init__(self, trace=False):
+        self.nodes = 0
+        self.backtracks = 0
+        self.checks = 0
+        self.calls = {}
+        self.trace = array("H") if trace else None
+        self.wrapped = []
+
+    def attach(self, grid):
+        for name in self.TIMED:
+            self.timed(grid, name)
+
+        # the classic engines' placements still on the board, each is followed by
+        # one recursive call and taken back by its caller when that call fails
+        placed = []
+
+        def node(method):
+            def wrapper():
+                self.nodes += 1
+                depth = len(placed)
+                result = method()
+                if not result:
+                    self.backtracks += 1
+                    if self.trace is not None:
+                        blank = grid.find_blank()
+                        if blank is not None:
+                            self.trace.extend((self.DEAD_END, blank[0] * len(grid.grid) + blank[1], 0))
+                        if depth:
+                            tile, num = placed.pop()
+                            self.trace.extend((self.REMOVE, tile, num))
+                elif not depth:
+                    del placed[:]
+                return result
+            return wrapper
+
+        def check(row, col, num, method=grid.OK_to_fill):
+            self.checks += 1
+            ok = method(row, col, num)
+            # the classic engines place num as soon as it is OK
+            if ok and self.trace is not None:
+                tile = row * len(grid.grid) + col
+                self.trace.extend((self.PLACE, tile, num))
+                placed.append((tile, num))
+            return ok
+
+        def new_solver(rng=None, method=grid.new_solver):
+            solver = method(rng=rng)
+            self.attach_solver(solver)
+            return solver
+
+        self.wrap(grid, "backtrack_fill", node(grid.backtrack_fill))
+        self.wrap(grid, "backtrack_solve", node(grid.backtrack_solve))
+        self.wrap(grid, "OK_to_fill", check)
+        self.wrap(grid, "new_solver", new_solver)
+
+    def attach_solver(self, solver):
+        def search(limit, method=solver.search):
+            self.nodes += 1
+            result = method(limit)
+            if not result:
+                self.backtracks += 1
+            return result
+
+        def candidates(i, method=solver.candidates):
+            self.checks += 1
+            return method(i)
+
+        solver.search = search
+        solver.candidates = candidates
+        if self.trace is not None:
+            def place(i, value, method=solver.place):
+                self.trace.extend((self.PLACE, i, value))
+                method(i, value)
+
+            def remove(i, method=solver.remove):
+                self.trace.extend((self.REMOVE, i, solver.cells[i]))
+                method(i)
+
+            solver.place = place
+            solver.remove = remove
+
+    def wrap(self, grid, name, wrapper):
+        setattr(grid, name, wrapper)
+        self.wrapped.append((grid, name))
+
+    def timed(self, grid, name):
+        method = getattr(grid, name)
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats = self.calls.setdefault(name, [0, 0.0])
+                stats[0] += 1
+                stats[1] += time.perf_counter() - start
+        self.wrap(grid, name, wrapper)
+
+    def detach(self):
+        # removing the instance attributes uncovers the class methods again
+        for grid, name in self.wrapped:
+            vars(grid).pop(name, None)
+        self.wrapped = []
+
+    def report(self):
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "checks": self.checks,
+            "calls": {name: {"count": count, "seconds": seconds} for name, (count, seconds) in self.calls.items()},
+            "trace_events": len(self.trace) // 3 if self.trace is not None else 0,
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for i in range(0, len(self.trace), 3):
+                f.write(f"{self.EVENTS[self.trace[i]]} {self.trace[i + 1]} {self.trace[i + 2]}\n")
@@ -9,6 +9,7 @@
 # user interactive graphics from Tile
 ################################################################
 import pygame
+import batch
 from Grid import Grid
 from Tile import Tile
 
@@ -20,9 +21,18 @@ class Play:
 
     Attributes
     ----------
-        self.grid : Grid()
-            Call the Grid class
+        self.grid : Grid(engine, difficulty=difficulty, box=box)
+            Call the Grid class, engine picks the "bitset" or "classic" solver
+            and difficulty picks the number of clues from Grid.DIFFICULTY
+            box is 3 for 9x9, 4 for 16x16 or 5 for 25x25
+            a ready made Grid, like one from PuzzlePool, can be passed in as grid instead
         
+        self.size : 9
+            rows, columns and digits on the board, taken from the grid
+
+        self.box : 3
+            the width of an inner box
+
         self.row : 9
             The numer of rows in Sudoku
 
@@ -47,6 +57,22 @@ class Play:
         self.highlighted : None
             boolean to hightlight the seleceted tile's row and columns
 
+        self.unit_digits : list
+            for each of the 27 rows, columns and boxes (3 * size), the set of tiles holding each digit
+
+        self.conflict_count : list
+            how many units repeat the digit in each tile
+
+        self.conflicts : set
+            the (row, col) of every tile whose digit is repeated in its row, column or box
+            each Tile's conflict flag is kept in step so the board can draw them for free
+
+        self.filled : int
+            the number of tiles that have a value
+
+        self.pencil : False
+            boolean to show each blank tile's candidates as small pencil marks
+
     Methods
     -------
         def __init__():
@@ -59,6 +85,9 @@ class Play:
             gets the coordinates of the selected tile to store a temporarty value until the user chooses to set the value into the tile
             
         def draw():
+            draws the grid lines and every tile
+
+        def draw_lines():
             uses pygame.draw.line to make horizontal and vertical lines that create the 9x9 gird layout
             draws a thicker line every 3rd line thats drawn
         
@@ -82,27 +111,64 @@ class Play:
             
         def check_solution():
             checks the if the players solution is correct or not
+
+        def units_of():
+            the row, column and box unit indexes of a tile
+
+        def add_value():
+            counts a digit into its units and updates the conflicts
+
+        def remove_value():
+            takes a digit out of its units and updates the conflicts
+
+        def mark():
+            adds to a tile's conflict count and keeps the conflicts set in step
+
+        def toggle_pencil():
+            turns the pencil marks on or off
+
+        def update_marks():
+            recomputes the candidates of the whole board in one batch call
     """
-    def __init__(self, width, height, display):
+    def __init__(self, width, height, display, engine="bitset", difficulty="easy", grid=None, box=3):
         
-        self.grid = Grid() #call Grid class 
-        self.row = 9 #number of rows
-        self.col = 9 #numer of columns
+        self.grid = grid if grid is not None else Grid(engine, difficulty=difficulty, box=box) #call Grid class 
+        self.size = self.grid.size
+        self.box = self.grid.box
+        self.row = self.size #number of rows
+        self.col = self.size #numer of columns
         self.display = display
         #list comprehension # call Tile class in a list with parameters of the called from Grid, i(row),j(column), width,height (of each individual tile), dislpaly for j(columns) from 0 - 8, for i(rows) from 0-8
-        self.tiles = [[Tile(self.grid.grid[i][j], i, j, width, height, self.display) 
-                       for j in range(9)] 
-                        for i in range(9)]
+        self.tiles = [[Tile(self.grid.grid[i][j], i, j, width, height, self.display, self.size) 
+                       for j in range(self.size)] 
+                        for i in range(self.size)]
         self.width = width # width of the game board
         self.height = height # height of the game board
         self.selected = None # set selected to None
         self.highlighted = None # set highlighted to None
+        # the tiles holding each digit in every row, column and box so
+        # placing or clearing a digit only touches its own 3 units
+        self.unit_digits = [[set() for _ in range(self.size + 1)] for _ in range(self.size * 3)]
+        self.conflict_count = [[0] * self.size for _ in range(self.size)]
+        self.conflicts = set()
+        self.filled = 0
+        for i in range(self.size):
+            for j in range(self.size):
+                if self.tiles[i][j].value:
+                    self.add_value(i, j, self.tiles[i][j].value)
+        self.pencil = False
  
     def location(self, value):
         # get the location of the row and col selected
         row, col = self.selected
+        # take the old value out of the counts before setting the new one
+        if self.tiles[row][col].value:
+            self.remove_value(row, col, self.tiles[row][col].value)
         # set the uer input value in that location
         self.tiles[row][col].set(value)
+        if value:
+            self.add_value(row, col, value)
+        self.update_marks()
         
     def temp_location(self, value):
         # get the location of the row and col selected
@@ -111,12 +177,19 @@ class Play:
         self.tiles[row][col].set_temp(value)
         
     def draw(self, display):
+        self.draw_lines(display)
+        for i in range(self.size):
+            for j in range(self.size):
+                #draw on the tiles on the display
+                self.tiles[i][j].draw(display)
+
+    def draw_lines(self, display):
         # gets the amount of space needed for a 9x9 grid to line up correctly 
-        space = self.width / 9 
+        space = self.width / self.size 
         # for the 10 lines of rows and 10 lines of columns 
         for i in range(self.row + 1):
             # draw a thickerline every 3rd row/col
-            if i % 3 == 0 and i != 0:
+            if i % self.box == 0 and i != 0:
                 thick = 3
             else:
                 #otherwise thickness is set to 1
@@ -125,11 +198,6 @@ class Play:
             pygame.draw.line(display, (255, 255, 255), (0, i * space), (self.width, i * space), thick)
                 # draw the white lines on the display as evenly spaced rows
             pygame.draw.line(display, (255, 255, 255), (i * space, 0), (i * space, self.height), thick)
-            
-        for i in range(9):
-            for j in range(9):
-                #draw on the tiles on the display
-                self.tiles[i][j].draw(display)
     
     def check_correct(self, row, col, num):
         #print(len(self.grid.get_sol()))
@@ -151,8 +219,8 @@ class Play:
         
     def clear_board(self):
         # clear the board from user interactive graphics
-        for i in range(9):
-            for j in range(9):
+        for i in range(self.size):
+            for j in range(self.size):
                 #set selected and highlighted to False
                 self.tiles[i][j].selected = False
                 self.tiles[i][j].highlighted = False
@@ -160,14 +228,14 @@ class Play:
     def highlightRow(self, row):
         #highlights the entire row in a different color when 
         #a single tile is selected 
-        for j in range(9):
+        for j in range(self.size):
             #print(int(row))
             self.tiles[int(row)][j].highlighted = True
         
     def highlightCol(self, col):
         #highlights the entire column in a different color when 
         #a single tile is selected 
-        for i in range(9):
+        for i in range(self.size):
             #print(int(col))
             self.tiles[i][int(col)].highlighted = True
         
@@ -182,14 +250,17 @@ class Play:
     def clear(self):
         # clears the uer input value 
         row, col = self.selected
+        if self.tiles[row][col].value:
+            self.remove_value(row, col, self.tiles[row][col].value)
         # clear the values to set and set_temp to 0
         self.tiles[row][col].set(0)
         self.tiles[row][col].set_temp(0)
+        self.update_marks()
         
     def click(self, position):
         # get the position when mouse click is detected
         if position[0] < self.width and position[1] < self.height:
-            space = self.width / 9
+            space = self.width / self.size
             x = position[0] // space
             y = position[1] // space
             #print(x,y)
@@ -200,28 +271,65 @@ class Play:
     
     def check_blank_tile(self):
         #checks if there are blank tiles on the grid
-        for i in range(9):
-            for j in range(9):
-                #print(self.tiles[i][j])
-                #if rows and column of the tiles is blank
-                if self.tiles[i][j] == 0:
-                    #print("blank T")
-                    return True 
-        #print("blank F")               
-        return False
+        return self.filled < self.size * self.size
     
     def check_solution(self):
         #checks if the solution is correct or not 
-        # call the solve function in Grid class
-        self.grid.solve()
-        for i in range(9):
-            for j in range(9):
-                #if Grid row, columns are not equal to the Tile values 
-                if self.grid.grid[i][j] != self.tiles[i][j].value:
-                    # return true (game is not complete) 
-                    #print("solution T")
-                    return True 
-        # return false only when the whole grid is filled with correct values
-        #print("solution F")               
-        return False        
-    
\ No newline at end of file
+        # return true (game is not complete) while there are blanks or repeats
+        # a full board with no repeats is a solution, and the Grid only makes
+        # puzzles with one solution so it matches the answer key too
+        return self.check_blank_tile() or len(self.conflicts) > 0
+
+    def units_of(self, row, col):
+        # row units are 0-8, columns 9-17 and boxes 18-26 (0 to 3 * size - 1 in general)
+        size, box = self.size, self.box
+        return (row, size + col, size * 2 + (row // box) * box + col // box)
+
+    def add_value(self, row, col, value):
+        self.filled += 1
+        for unit in self.units_of(row, col):
+            cells = self.unit_digits[unit][value]
+            cells.add((row, col))
+            # the second copy puts both tiles in conflict, any more only the new one
+            if len(cells) == 2:
+                for cell in cells:
+                    self.mark(cell, 1)
+            elif len(cells) > 2:
+                self.mark((row, col), 1)
+
+    def remove_value(self, row, col, value):
+        self.filled -= 1
+        for unit in self.units_of(row, col):
+            cells = self.unit_digits[unit][value]
+            if len(cells) == 2:
+                for cell in cells:
+                    self.mark(cell, -1)
+            elif len(cells) > 2:
+                self.mark((row, col), -1)
+            cells.discard((row, col))
+
+    def mark(self, cell, amount):
+        row, col = cell
+        self.conflict_count[row][col] += amount
+        conflict = self.conflict_count[row][col] > 0
+        self.tiles[row][col].conflict = conflict
+        if conflict:
+            self.conflicts.add(cell)
+        else:
+            self.conflicts.discard(cell)
+
+    def toggle_pencil(self):
+        self.pencil = not self.pencil
+        for row in self.tiles:
+            for tile in row:
+                tile.pencil = self.pencil
+        self.update_marks()
+
+    def update_marks(self):
+        # one call works out the candidates for every tile at once
+        if not self.pencil:
+            return
+        marks = batch.candidates([[tile.value for tile in row] for row in self.tiles])[0]
+        for i in range(self.size):
+            for j in range(self.size):
+                self.tiles[i][j].marks = int(marks[i][j])
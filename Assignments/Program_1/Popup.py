@@ -0,0 +1,81 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This Popup class draws the end of game message inside the
+# pygame window. It takes the same content list as
+# utilities.makePopUp but builds the popup once as a pygame
+# surface, so showing it doesn't open another program or
+# write an image to disk
+#############################################################
+import pygame
+
+
+class Popup:
+    """
+    The Popup class pre-composes a rounded message box that the Board draws over the game
+
+    Attributes
+    ----------
+        fonts : {}
+            every pygame font loaded so far keyed by (font_name, size), shared by all popups
+
+        self.surface : Surface
+            the finished popup with its border and text
+
+        self.rect : Rect
+            where the popup is drawn, centered in the window
+
+    Methods
+    -------
+        def font():
+            returns a cached font, loading it the first time
+
+        def __init__():
+            draws the box and every line of content onto the surface
+
+        def draw():
+            blits the popup onto the display
+    """
+    fonts = {}
+
+    @classmethod
+    def font(cls, font_name, size):
+        key = (font_name, size)
+        if key not in cls.fonts:
+            cls.fonts[key] = pygame.font.Font(font_name, size)
+        return cls.fonts[key]
+
+    def __init__(self, content, center, **kwargs):
+        width = kwargs.get("width", 300)
+        height = kwargs.get("height", 300)
+        fill_color = kwargs.get("fill_color", "white")
+        border_size = kwargs.get("border_size", 5)
+        border_color = kwargs.get("border_color", "black")
+        border_radius = kwargs.get("border_radius", 7)
+        font_name = kwargs.get("font_name", "fonts/Futura.ttf")
+
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        box = self.surface.get_rect()
+        pygame.draw.rect(self.surface, fill_color, box, border_radius=border_radius)
+        pygame.draw.rect(self.surface, border_color, box, border_size, border_radius=border_radius)
+
+        # lays the lines out the same way makePopUp does
+        y = border_size
+        for line in content:
+            size = line['font_size']
+            font = self.font(line.get('font_name', font_name), size)
+            text = font.render(line['text'], 1, line.get('color', "black"))
+            x = border_size
+            if line.get('align') == 'center':
+                x = (width // 2) - (size // 2)
+            elif line.get('align') == 'right':
+                x = border_size + width - size
+            self.surface.blit(text, (x, y))
+            y += size + size // 2 + 5
+
+        self.rect = self.surface.get_rect(center=center)
+
+    def draw(self, display):
+        return display.blit(self.surface, self.rect)
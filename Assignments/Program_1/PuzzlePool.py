@@ -0,0 +1,167 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This PuzzlePool class keeps a few puzzles ready for every
+# difficulty so a new game never waits on the generator.
+# Puzzles are built in worker processes in the background
+# and the spares are saved to disk when the game closes so
+# the next launch starts with a full pool.
+#############################################################
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+from Grid import Grid, DIFFICULTY
+
+
+def make_puzzle(engine, difficulty, seed, box=3):
+    # lives at module level so the worker processes can pickle it
+    grid = Grid(engine, seed=seed, difficulty=difficulty, box=box)
+    return {
+        "seed": seed,
+        "difficulty": difficulty,
+        "puzzle": grid.grid,
+        "solution": grid.solution,
+        "rating": grid.rating,
+        "gen_time": grid.gen_time,
+    }
+
+
+class PuzzlePool:
+    """
+    The PuzzlePool class hands out ready made Grids and refills itself in the background
+
+    Attributes
+    ----------
+        self.size : 3
+            number of puzzles to keep ready for each difficulty
+
+        self.engine : "bitset"
+            engine passed to Grid when a puzzle is made
+
+        self.box : 3
+            inner box width passed to Grid, the cache only keeps puzzles of one box width
+
+        self.next_seed : seed
+            seed for the next puzzle, every puzzle gets its own seed. the seed
+            fixes the solution but digging stops at the time budget, so the
+            puzzle and solution are kept with it instead of rebuilt from it
+
+        self.cache_path : "puzzle_cache.json"
+            file the spare puzzles are saved to, None turns the cache off
+
+        self.ready : dict
+            a deque of finished puzzles for each difficulty
+
+        self.pending : dict
+            futures still running in the process pool for each difficulty
+
+        self.hits : 0
+            number of get() calls answered from the pool
+
+        self.misses : 0
+            number of get() calls that had to build a puzzle on the spot
+
+    Methods
+    -------
+        def __init__():
+            loads the cache and starts filling the pool
+
+        def get():
+            returns a Grid for the difficulty and tops the pool back up
+
+        def collect():
+            moves finished futures into the ready puzzles without waiting
+
+        def refill():
+            submits new puzzles until every difficulty has size ready or pending
+
+        def load():
+            reads the spare puzzles and next seed from the cache file
+
+        def save():
+            writes the spare puzzles and next seed to the cache file
+
+        def close():
+            stops the workers and saves the spares
+    """
+    def __init__(self, size=3, difficulties=tuple(DIFFICULTY), engine="bitset", seed=0,
+                 cache_path="puzzle_cache.json", workers=None, box=3):
+        self.size = size
+        self.engine = engine
+        self.box = box
+        self.next_seed = seed
+        self.cache_path = cache_path
+        self.ready = {d: deque() for d in difficulties}
+        self.pending = {d: [] for d in difficulties}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.refill()
+
+    def new_seed(self):
+        seed = self.next_seed
+        self.next_seed += 1
+        return seed
+
+    def get(self, difficulty="easy"):
+        self.collect()
+        if self.ready[difficulty]:
+            self.hits += 1
+            record = self.ready[difficulty].popleft()
+        else:
+            # nothing finished yet, build one here rather than wait on a worker
+            self.misses += 1
+            record = make_puzzle(self.engine, difficulty, self.new_seed(), self.box)
+        self.refill()
+        return Grid(self.engine, seed=record["seed"], difficulty=difficulty,
+                    puzzle=record["puzzle"], solution=record["solution"])
+
+    def collect(self):
+        for difficulty, futures in self.pending.items():
+            for future in [f for f in futures if f.done()]:
+                futures.remove(future)
+                if future.exception() is None:
+                    self.ready[difficulty].append(future.result())
+
+    def refill(self):
+        for difficulty in self.ready:
+            while len(self.ready[difficulty]) + len(self.pending[difficulty]) < self.size:
+                future = self.executor.submit(make_puzzle, self.engine, difficulty, self.new_seed(), self.box)
+                self.pending[difficulty].append(future)
+
+    def load(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            # a broken cache just means starting with an empty pool
+            return
+        if cache.get("engine") != self.engine or cache.get("box", 3) != self.box:
+            return
+        self.next_seed = max(self.next_seed, cache.get("next_seed", 0))
+        for difficulty, records in cache.get("puzzles", {}).items():
+            if difficulty in self.ready:
+                self.ready[difficulty].extend(records)
+
+    def save(self):
+        if self.cache_path is None:
+            return
+        cache = {
+            "engine": self.engine,
+            "box": self.box,
+            "next_seed": self.next_seed,
+            "puzzles": {d: list(records) for d, records in self.ready.items()},
+        }
+        with open(self.cache_path, "w") as f:
+            json.dump(cache, f)
+
+    def close(self):
+        self.collect()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.save()
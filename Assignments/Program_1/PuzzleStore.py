@@ -0,0 +1,254 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This PuzzleStore class keeps pre-generated puzzles in a
+# compact binary file. Every puzzle is a fixed size record so
+# any one of them can be read straight out of a memory mapped
+# file without loading the rest. A separate index file sorts
+# the records by difficulty and seed so a random puzzle of a
+# difficulty, or the puzzle for a seed, is found without a scan
+#
+# store file:  header, then one record per puzzle
+#   record:    seed (8 bytes), difficulty, rating,
+#              givens bitmask (1 bit per tile),
+#              solution digits (4 bits per tile for 9x9)
+# index file:  header, (start, count) for every difficulty,
+#              then (seed, record number) sorted by difficulty and seed
+#############################################################
+import mmap
+import os
+import random
+import struct
+from Grid import Grid, DIFFICULTY
+
+# the difficulty byte in a record is the position of its name in this list
+LEVELS = list(DIFFICULTY)
+
+
+class PuzzleStore:
+    """
+    The PuzzleStore class appends puzzles to a binary store file and reads them back by index
+
+    Attributes
+    ----------
+        self.path : path
+            the store file, the index is saved next to it as path + ".idx"
+
+        self.box : 3
+            the inner box width of the puzzles in the store, read from the header
+
+        self.cells : 81
+            tiles per puzzle
+
+        self.bits : 4
+            bits used for each solution digit
+
+        self.record : struct.Struct
+            layout of one puzzle record
+
+        self.sections : dict
+            the (start, count) of each difficulty's entries in the index
+
+    Methods
+    -------
+        def __init__():
+            creates the store if it is missing and maps the files
+
+        def set_layout():
+            works out the record size for a box width
+
+        def encode():
+            packs a puzzle into record bytes
+
+        def decode():
+            unpacks record bytes into a puzzle dict
+
+        def to_rows():
+            splits a flat board into rows
+
+        def append():
+            adds puzzles to the end of the store, build_index() makes them findable
+
+        def build_index():
+            sorts every record by difficulty and seed into the index file
+
+        def open_maps():
+            memory maps the store and index files for reading
+
+        def count():
+            the number of indexed puzzles for a difficulty
+
+        def entry():
+            the (seed, record number) at a position in the index
+
+        def read():
+            returns the puzzle dict stored at a record number
+
+        def grid():
+            makes a Grid from a puzzle dict
+
+        def random():
+            returns a Grid for a random puzzle of a difficulty
+
+        def find():
+            returns the Grid for a difficulty and seed, or None
+
+        def close():
+            unmaps the files
+    """
+    MAGIC = b"SDKS"
+    INDEX_MAGIC = b"SDKI"
+    VERSION = 1
+    # magic, version, box, record size
+    HEADER = struct.Struct("<4sBBH")
+    # magic, number of difficulties, then (start, count) for each
+    INDEX_HEADER = struct.Struct("<4sI")
+    SECTION = struct.Struct("<II")
+    # seed, record number
+    ENTRY = struct.Struct("<QI")
+
+    def __init__(self, path, box=3):
+        self.path = path
+        self.index_path = path + ".idx"
+        if not os.path.exists(path):
+            self.set_layout(box)
+            with open(path, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, box, self.record.size))
+        else:
+            with open(path, "rb") as f:
+                magic, version, box, size = self.HEADER.unpack(f.read(self.HEADER.size))
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError(f"{path} is not a puzzle store")
+            self.set_layout(box)
+        self.store_map = None
+        self.index_map = None
+        self.sections = {}
+        self.open_maps()
+
+    def set_layout(self, box):
+        self.box = box
+        self.size = box * box
+        self.cells = self.size * self.size
+        self.bits = (self.size - 1).bit_length()
+        self.mask_bytes = (self.cells + 7) // 8
+        self.digit_bytes = (self.cells * self.bits + 7) // 8
+        self.record = struct.Struct(f"<QBB{self.mask_bytes}s{self.digit_bytes}s")
+
+    def encode(self, puzzle):
+        flat_puzzle = [v for row in puzzle["puzzle"] for v in row]
+        flat_solution = [v for row in puzzle["solution"] for v in row]
+        mask = 0
+        digits = 0
+        for i in range(self.cells):
+            if flat_puzzle[i]:
+                mask |= 1 << i
+            # digits are stored as 0 to size - 1 so 9x9 fits in 4 bits
+            digits |= (flat_solution[i] - 1) << (i * self.bits)
+        return self.record.pack(puzzle["seed"], LEVELS.index(puzzle["difficulty"]),
+                                min(puzzle.get("rating", 0), 255),
+                                mask.to_bytes(self.mask_bytes, "little"),
+                                digits.to_bytes(self.digit_bytes, "little"))
+
+    def decode(self, data):
+        seed, level, rating, mask, digits = self.record.unpack(data)
+        mask = int.from_bytes(mask, "little")
+        digits = int.from_bytes(digits, "little")
+        low = (1 << self.bits) - 1
+        solution = [(digits >> (i * self.bits) & low) + 1 for i in range(self.cells)]
+        puzzle = [v if mask >> i & 1 else 0 for i, v in enumerate(solution)]
+        return {"seed": seed, "difficulty": LEVELS[level], "rating": rating,
+                "puzzle": self.to_rows(puzzle), "solution": self.to_rows(solution)}
+
+    def to_rows(self, flat):
+        return [flat[r * self.size:(r + 1) * self.size] for r in range(self.size)]
+
+    def append(self, puzzles):
+        with open(self.path, "ab") as f:
+            for puzzle in puzzles:
+                f.write(self.encode(puzzle))
+
+    def build_index(self):
+        self.close()
+        entries = []
+        with open(self.path, "rb") as f:
+            data = f.read(self.HEADER.size)
+            number = 0
+            while True:
+                data = f.read(self.record.size)
+                if len(data) < self.record.size:
+                    break
+                seed, level = struct.unpack_from("<QB", data)
+                entries.append((level, seed, number))
+                number += 1
+        entries.sort()
+        counts = [0] * len(LEVELS)
+        for entry in entries:
+            counts[entry[0]] += 1
+        with open(self.index_path, "wb") as f:
+            f.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, len(LEVELS)))
+            start = 0
+            for count in counts:
+                f.write(self.SECTION.pack(start, count))
+                start += count
+            for level, seed, number in entries:
+                f.write(self.ENTRY.pack(seed, number))
+        self.open_maps()
+
+    def open_maps(self):
+        if os.path.getsize(self.path) > self.HEADER.size:
+            with open(self.path, "rb") as f:
+                self.store_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.sections = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                self.index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, levels = self.INDEX_HEADER.unpack_from(self.index_map)
+            offset = self.INDEX_HEADER.size
+            for level in range(levels):
+                self.sections[LEVELS[level]] = self.SECTION.unpack_from(self.index_map, offset)
+                offset += self.SECTION.size
+            self.entries_offset = offset
+
+    def count(self, difficulty):
+        return self.sections.get(difficulty, (0, 0))[1]
+
+    def entry(self, position):
+        return self.ENTRY.unpack_from(self.index_map, self.entries_offset + position * self.ENTRY.size)
+
+    def read(self, number):
+        offset = self.HEADER.size + number * self.record.size
+        return self.decode(self.store_map[offset:offset + self.record.size])
+
+    def grid(self, puzzle):
+        return Grid(seed=puzzle["seed"], difficulty=puzzle["difficulty"],
+                    puzzle=puzzle["puzzle"], solution=puzzle["solution"])
+
+    def random(self, difficulty, rng=random):
+        start, count = self.sections[difficulty]
+        seed, number = self.entry(start + rng.randrange(count))
+        return self.grid(self.read(number))
+
+    def find(self, difficulty, seed):
+        # binary search the difficulty's section of the index by seed
+        start, count = self.sections.get(difficulty, (0, 0))
+        low, high = start, start + count
+        while low < high:
+            middle = (low + high) // 2
+            if self.entry(middle)[0] < seed:
+                low = middle + 1
+            else:
+                high = middle
+        if low < start + count:
+            found, number = self.entry(low)
+            if found == seed:
+                return self.grid(self.read(number))
+        return None
+
+    def close(self):
+        for m in (self.store_map, self.index_map):
+            if m is not None:
+                m.close()
+        self.store_map = None
+        self.index_map = None
@@ -0,0 +1,266 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This Solver class is the constraint propagation engine
+# behind the Grid class. Every row, column and 3x3 box keeps
+# a bitmask of the digits already used so checking a digit is
+# a single AND instead of rescanning the board. Search always
+# branches on the tile with the fewest candidates and fills
+# naked and hidden singles before it has to guess.
+#############################################################
+import random
+
+
+class Solver:
+    """
+    The Solver class fills or solves a sudoku board using bitmasks for each row, column and box
+
+    Attributes
+    ----------
+        self.box : box
+            the width of an inner box, 3 for a 9x9 board
+
+        self.size : box * box
+            the number of rows, columns and digits on the board
+
+        self.full : (1 << size) - 1
+            bitmask with a bit set for every digit, bit 0 is the digit 1
+
+        self.cells : list
+            the board flattened row by row, 0 is a blank tile
+
+        self.rows, self.cols, self.boxes : list
+            bitmask of the digits used in each row, column and box
+
+        self.units : list
+            the tile indexes of every row, column and box, used for hidden singles
+
+        self.valid : bool
+            False if the starting board already repeats a digit in a unit
+
+        self.rng : random.Random
+            random generator used to shuffle the digit order when randomize is set
+
+        self.nodes : 0
+            the number of search calls made
+
+        self.backtracks : 0
+            the number of guesses that had to be taken back
+
+        self.node_limit : None
+            search calls allowed before the search gives up, None never gives up
+
+        self.aborted : False
+            set when the search gave up at node_limit
+
+    Methods
+    -------
+        def __init__():
+            builds the bitmasks from a 2d list board
+
+        def candidates():
+            returns the bitmask of digits that can still go in a tile
+
+        def place():
+            puts a digit in a tile and marks it in the row, column and box
+
+        def remove():
+            takes a digit back out of a tile
+
+        def propagate():
+            fills every naked single (a tile with one candidate) and hidden single
+            (a digit with one possible tile in a unit) until nothing changes
+
+        def most_constrained():
+            finds the blank tile with the fewest candidates
+
+        def search():
+            recursive propagate and guess search, stops after limit solutions
+
+        def solve():
+            solves the board in place, returns True if a solution was found
+
+        def count_solutions():
+            counts the solutions up to limit, a search that gives up counts as limit
+
+        def rating():
+            the number of guesses needed to prove the solution is unique,
+            0 means naked and hidden singles alone solve the board
+
+        def to_grid():
+            returns the board as a 2d list
+    """
+    def __init__(self, grid, box=3, rng=None):
+        self.box = box
+        self.size = box * box
+        self.full = (1 << self.size) - 1
+        self.cells = [value for row in grid for value in row]
+        self.rows = [0] * self.size
+        self.cols = [0] * self.size
+        self.boxes = [0] * self.size
+        # row, column and box of every tile index so we never divide in the search
+        self.row_of = [i // self.size for i in range(self.size * self.size)]
+        self.col_of = [i % self.size for i in range(self.size * self.size)]
+        self.box_of = [(r // box) * box + c // box for r, c in zip(self.row_of, self.col_of)]
+        self.units = [[] for _ in range(self.size * 3)]
+        for i in range(self.size * self.size):
+            self.units[self.row_of[i]].append(i)
+            self.units[self.size + self.col_of[i]].append(i)
+            self.units[self.size * 2 + self.box_of[i]].append(i)
+        self.rng = rng if rng is not None else random
+        self.randomize = False
+        self.solutions = 0
+        self.nodes = 0
+        self.backtracks = 0
+        self.node_limit = None
+        self.aborted = False
+        self.valid = True
+        for i, value in enumerate(self.cells):
+            if value == 0:
+                continue
+            bit = 1 << (value - 1)
+            if (self.rows[self.row_of[i]] | self.cols[self.col_of[i]] | self.boxes[self.box_of[i]]) & bit:
+                self.valid = False
+            self.cells[i] = 0
+            self.place(i, value)
+
+    def candidates(self, i):
+        # every digit not already used in the tile's row, column or box
+        return self.full & ~(self.rows[self.row_of[i]] | self.cols[self.col_of[i]] | self.boxes[self.box_of[i]])
+
+    def place(self, i, value):
+        bit = 1 << (value - 1)
+        self.cells[i] = value
+        self.rows[self.row_of[i]] |= bit
+        self.cols[self.col_of[i]] |= bit
+        self.boxes[self.box_of[i]] |= bit
+
+    def remove(self, i):
+        bit = ~(1 << (self.cells[i] - 1))
+        self.cells[i] = 0
+        self.rows[self.row_of[i]] &= bit
+        self.cols[self.col_of[i]] &= bit
+        self.boxes[self.box_of[i]] &= bit
+
+    def propagate(self, trail):
+        # keeps placing forced digits, every placement is pushed on the trail
+        # so the caller can take them back. returns False on a dead end
+        cells = self.cells
+        cands = [0] * len(cells)
+        changed = True
+        while changed:
+            changed = False
+            # naked singles: a blank tile with only one candidate left
+            for i in range(len(cells)):
+                if cells[i]:
+                    continue
+                cand = self.candidates(i)
+                if cand == 0:
+                    return False
+                if cand & (cand - 1) == 0:
+                    self.place(i, cand.bit_length())
+                    trail.append(i)
+                    changed = True
+                cands[i] = cand
+            # the cheap pass made progress, run it again before the hidden singles
+            if changed:
+                continue
+            # hidden singles: a digit that only fits in one tile of a unit
+            # cands was saved by the pass above, placing a digit only shrinks the
+            # real candidates so a saved one can be too wide but never misses one
+            for unit in self.units:
+                once = twice = used = 0
+                for i in unit:
+                    if cells[i]:
+                        used |= 1 << (cells[i] - 1)
+                        continue
+                    cand = cands[i]
+                    twice |= once & cand
+                    once |= cand
+                if (once | used) != self.full:
+                    return False
+                singles = once & ~twice & ~used
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    for i in unit:
+                        if cells[i] == 0 and self.candidates(i) & bit:
+                            self.place(i, bit.bit_length())
+                            trail.append(i)
+                            changed = True
+                            break
+        return True
+
+    def most_constrained(self):
+        # minimum remaining values, ties go to the first tile found
+        best, best_count = None, self.size + 1
+        for i, value in enumerate(self.cells):
+            if value:
+                continue
+            count = bin(self.candidates(i)).count("1")
+            if count < best_count:
+                best, best_count = i, count
+                if count <= 2:
+                    break
+        return best
+
+    def search(self, limit):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            # unwinds the whole search without undoing it, the board is left half
+            # filled so a Solver that gave up should be thrown away
+            self.aborted = True
+            return True
+        trail = []
+        if self.propagate(trail):
+            i = self.most_constrained()
+            if i is None:
+                self.solutions += 1
+                if self.solutions >= limit:
+                    return True
+            else:
+                cand = self.candidates(i)
+                digits = [d for d in range(1, self.size + 1) if cand >> (d - 1) & 1]
+                if self.randomize:
+                    self.rng.shuffle(digits)
+                for d in digits:
+                    self.place(i, d)
+                    if self.search(limit):
+                        return True
+                    self.remove(i)
+                    self.backtracks += 1
+        # dead end, undo everything propagate placed at this level
+        for i in reversed(trail):
+            self.remove(i)
+        return False
+
+    def solve(self, randomize=False):
+        if not self.valid:
+            return False
+        self.randomize = randomize
+        self.solutions = 0
+        return self.search(1) and not self.aborted
+
+    def count_solutions(self, limit=2):
+        # stops as soon as limit solutions are found, limit=2 is enough to
+        # tell a unique puzzle from one with several answers
+        if not self.valid:
+            return 0
+        self.randomize = False
+        self.solutions = 0
+        self.search(limit)
+        # the answer isn't known, so it can't be trusted to be unique
+        if self.aborted:
+            return limit
+        return self.solutions
+
+    def rating(self):
+        self.nodes = 0
+        if self.count_solutions(2) == 0:
+            return -1
+        return self.nodes - 1
+
+    def to_grid(self):
+        return [self.cells[r * self.size:(r + 1) * self.size] for r in range(self.size)]
@@ -7,19 +7,7 @@
 # graphics while playing the sudoku game
 #############################################################
 import pygame
-
-def draw_rect_alpha(surface, color, rect):
-    """
-        makes a transparent color filled rectangle 
-    Args:
-        surface (surface): pygame display
-        color (RGBA): color of the highlighted rectangle
-        rect (rect): pygame rectangle
-    """
-    shape_surf = pygame.Surface(pygame.Rect(rect).size, pygame.SRCALPHA)
-    pygame.draw.rect(shape_surf, color, shape_surf.get_rect())
-    surface.blit(shape_surf, rect)
-    
+from GlyphAtlas import GlyphAtlas
 
 class Tile:
     """
@@ -44,6 +32,9 @@ class Tile:
             
         WHITE : (255, 255, 255)
             color of the value in the tile
+
+        RED : (255, 70, 70)
+            color of a value that is repeated in its row, column or box
             
         HIGHLIGHT : pygame.Color(0, 255, 140, 75)
             color of the highlighted row and column of the selected tile using alpha values to make it transparent
@@ -72,14 +63,29 @@ class Tile:
         self.highlighted : False
             boolean initially sets a highlighted tile to false
 
+        self.conflict : False
+            boolean set by Play when the value is repeated in its row, column or box
+
+        self.pencil : False
+            boolean to draw the pencil marks in a blank tile
+
+        self.marks : 0
+            bitmask of the digits that can still go in the tile, bit 0 is the digit 1
+
         self.display : display
             pygame display
 
+        self.size : 9
+            rows and columns on the board, 16 or 25 for the bigger boards
+
     Methods
     ------- 
         def __init__():
             init method lets the the Tile class initialize its objects attributes
 
+        def atlas() :
+            the shared GlyphAtlas of digits and overlays for this tile size
+
         def draw() :
             allows the user to input values in each individual tile
             sets a temporary value in gray at the top left of the tile box
@@ -91,6 +97,13 @@ class Tile:
             
         def set_temp() :
             allows the user to set a temporary value in the selected tile
+
+        def rect() :
+            the area of the window the tile covers
+
+        def state() :
+            everything that changes how the tile looks, so the Board can
+            tell when it needs to be redrawn
     
     """
     # set the row and column to 9 x 9
@@ -101,9 +114,10 @@ class Tile:
     BLACK = (0, 0, 0)
     GREEN = (10, 246, 165)
     WHITE = (255, 255, 255)
+    RED = (255, 70, 70)
     HIGHLIGHT = pygame.Color(0,255, 140, 75)
 
-    def __init__(self, value, row, col, width, height, display):
+    def __init__(self, value, row, col, width, height, display, size=9):
         self.value = value
         self.temp = 0
         self.row = row
@@ -112,33 +126,55 @@ class Tile:
         self.height = height
         self.selected = False
         self.highlighted = False
+        self.conflict = False
+        self.pencil = False
+        self.marks = 0
         self.display = display
+        self.size = size
+
+    def atlas(self):
+        # one atlas per tile size, shared by every tile
+        # the font shrinks with the tiles, 26 is the size for a 9x9 board
+        return GlyphAtlas.get(self.width / self.size, (self.WHITE, self.GRAY, self.RED), self.HIGHLIGHT, self.GREEN,
+                              self.GRAY, digits=self.size, font_size=max(8, round(26 * 9 / self.size)))
 
     def draw(self, box):
-        font = pygame.font.Font("fonts/Futura.ttf", 26)
+        # digits and overlays come pre-rendered from the atlas so
+        # drawing a tile doesn't load fonts or make new surfaces
+        atlas = self.atlas()
         # space is equal to the width o the game board / 9
         # this is to evenly space everything in a 9x9 grid
-        space = self.width / 9
+        space = self.width / self.size
         
         x = self.col * space
         y = self.row * space
         
         if self.temp != 0 and self.value == 0:
             # temporarily puts the value in the top left corner
-            text = font.render(str(self.temp), 1, self.GRAY)
+            text = atlas.glyph(self.temp, self.GRAY)
             box.blit(text, (x + 3, y + 3))
         elif self.value != 0:
             # sets the value in the center of the tile 
-            text = font.render(str(self.value), 1, self.WHITE)
+            text = atlas.glyph(self.value, self.RED if self.conflict else self.WHITE)
             box.blit(text, (x + (space / 2 - text.get_width() / 2), y + (space / 2 - text.get_height() / 2)))
+        elif self.pencil and self.marks:
+            # small candidates laid out like a phone keypad, 1 top left to 9 bottom right
+            per_row = int(round(self.size ** 0.5))
+            sub = space / per_row
+            for digit in range(1, self.size + 1):
+                if self.marks >> (digit - 1) & 1:
+                    text = atlas.marks[digit]
+                    mx = x + ((digit - 1) % per_row) * sub + sub / 2 - text.get_width() / 2
+                    my = y + ((digit - 1) // per_row) * sub + sub / 2 - text.get_height() / 2
+                    box.blit(text, (mx, my))
             
         if self.highlighted:
             # highlights the row and col of the selected item 
-            draw_rect_alpha(self.display, self.HIGHLIGHT, (x, y, space, space))
+            box.blit(atlas.highlight, (x, y))
             
         if self.selected:
             # draws a rectangle around the selected tile
-            pygame.draw.rect(box, self.GREEN, (x, y, space, space), 3)
+            box.blit(atlas.selection, (x, y))
             
     def set(self, value):
         # permanately set the user input value 
@@ -146,4 +182,12 @@ class Tile:
         
     def set_temp(self, value):
         #temporarily set the user input value
-        self.temp = value
\ No newline at end of file
+        self.temp = value
+
+    def rect(self):
+        space = self.width / self.size
+        return pygame.Rect(round(self.col * space), round(self.row * space), round(space), round(space))
+
+    def state(self):
+        return (self.value, self.temp, self.selected, self.highlighted, self.conflict,
+                self.pencil and self.marks)
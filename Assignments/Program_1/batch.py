@@ -0,0 +1,93 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# This batch module checks whole stacks of boards at once with
+# NumPy. Boards come in as an (N, 9, 9) array with 0 for blank
+# tiles, and every function answers for all N boards in one
+# call instead of looping over tiles in Python
+#############################################################
+import numpy as np
+
+'''
+Functions
+---------
+
+    def as_boards() :
+        turns one board or a list of boards into an (N, size, size) array
+
+    def unit_counts() :
+        how many times each digit appears in every row, column and box
+
+    def unit_masks() :
+        bitmask of the digits used in every row, column and box
+
+    def conflict_masks() :
+        (N, size, size) bool, True where a tile's digit repeats in its row, column or box
+
+    def validate() :
+        (N,) bool, True for boards with no repeated digits, and no blanks when complete is set
+
+    def candidates() :
+        (N, size, size) bitmask of the digits each blank tile can still take,
+        bit 0 is the digit 1 and filled tiles are 0
+'''
+
+
+def as_boards(boards):
+    boards = np.asarray(boards, dtype=np.int16)
+    if boards.ndim == 2:
+        boards = boards[None]
+    return boards
+
+
+def unit_counts(boards):
+    n, size = boards.shape[0], boards.shape[1]
+    box = int(round(size ** 0.5))
+    # one_hot[n, r, c, d] is True when tile (r, c) holds the digit d + 1
+    one_hot = boards[..., None] == np.arange(1, size + 1)
+    rows = one_hot.sum(axis=2, dtype=np.int8)
+    cols = one_hot.sum(axis=1, dtype=np.int8)
+    boxes = one_hot.reshape(n, box, box, box, box, size).sum(axis=(2, 4), dtype=np.int8)
+    # spread the box counts back out so they line up with every tile
+    boxes = boxes.repeat(box, axis=1).repeat(box, axis=2)
+    return one_hot, rows, cols, boxes
+
+
+def unit_masks(boards):
+    n, size = boards.shape[0], boards.shape[1]
+    box = int(round(size ** 0.5))
+    # bits[n, r, c] has the bit for the tile's digit set, blanks stay 0
+    # shifted as int32, the int16 boards would lose the digits 17 to 25
+    bits = np.zeros(boards.shape, dtype=np.int32)
+    np.left_shift(np.int32(1), boards.astype(np.int32) - 1, out=bits, where=boards > 0)
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    # gather each box's tiles into the last axis before or-ing them together
+    boxes = bits.reshape(n, box, box, box, box).transpose(0, 1, 3, 2, 4).reshape(n, box, box, size)
+    boxes = np.bitwise_or.reduce(boxes, axis=3)
+    return rows, cols, boxes.repeat(box, axis=1).repeat(box, axis=2)
+
+
+def conflict_masks(boards):
+    boards = as_boards(boards)
+    one_hot, rows, cols, boxes = unit_counts(boards)
+    repeated = (rows[:, :, None, :] > 1) | (cols[:, None, :, :] > 1) | (boxes > 1)
+    return (repeated & one_hot).any(axis=-1)
+
+
+def validate(boards, complete=False):
+    boards = as_boards(boards)
+    valid = ~conflict_masks(boards).any(axis=(1, 2))
+    if complete:
+        valid &= (boards != 0).all(axis=(1, 2))
+    return valid
+
+
+def candidates(boards):
+    boards = as_boards(boards)
+    full = (1 << boards.shape[1]) - 1
+    rows, cols, boxes = unit_masks(boards)
+    used = rows[:, :, None] | cols[:, None, :] | boxes
+    return np.where(boards == 0, full & ~used, 0)
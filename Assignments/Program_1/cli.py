@@ -0,0 +1,332 @@
+##########################################################
+                    # Leslie Cook
+                    # Sudoku Pygame
+                    # 5443 - 2D gaming
+                    # Griffin - Spring 23
+###########################################################
+# Runs the Grid engines without pygame so puzzles can be
+# generated, solved and checked in bulk and timed.
+#
+# Puzzles are one per line: 81 characters for the board,
+# '.' for a blank, then optionally a space and the solution
+# 16x16 and 25x25 boards are 256 and 625 characters, A-P for 10-25
+#
+#   python cli.py generate -n 100 --seed 1 --difficulty hard -o hard.txt
+#   python cli.py solve hard.txt --engine classic
+#   python cli.py solve hard.txt --stats --trace trace.txt
+#   python cli.py validate hard.txt
+#   python cli.py bench
+#   python cli.py bench --boxes 3 4 5
+#   python cli.py pack -n 10000 --difficulty hard --store puzzles.store
+###########################################################
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import batch
+from Grid import Grid, DIFFICULTY, to_line, from_line
+from Instrument import Instrument
+from PuzzlePool import make_puzzle
+from PuzzleStore import PuzzleStore
+from Solver import Solver
+
+"""
+Functions
+---------
+
+    def percentile() :
+        the value at a percentage of the way through a sorted list
+
+    def report() :
+        prints the rate, p50/p99 time and backtracks for a batch
+
+    def read_puzzles() :
+        reads (puzzle, solution) boards from a one line per puzzle file
+
+    def check() :
+        returns the problem with a puzzle and its solution, or None
+        the batch module has already checked the givens and solutions for repeats
+
+    def instrument() :
+        returns an Instrument when --stats or --trace asks for one, else None
+
+    def show_stats() :
+        prints the Instrument's counters and writes its trace file
+
+    def generate() :
+        builds puzzles from consecutive seeds and writes them out
+
+    def solve() :
+        solves every puzzle in a file with the chosen engine
+
+    def validate() :
+        checks every puzzle has one solution that matches the file
+
+    def bench() :
+        times Grid.solve on the corpus and Grid.fill_tiles on empty boards,
+        then Grid.build_grid and Grid.solve on new puzzles for each board size
+
+    def pack() :
+        generates puzzles in worker processes into a PuzzleStore and re-indexes it
+
+"""
+
+# the puzzles bench runs by default, made with
+# python cli.py generate -n 100 --seed 2023 --difficulty hard --solutions -o puzzles/hard.txt
+CORPUS = "puzzles/hard.txt"
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def report(label, times, backtracks=None):
+    total = sum(times)
+    line = (f"{label:<22} {len(times):>5} puzzles  {len(times) / total:>9.1f}/sec  "
+            f"p50 {percentile(times, 50) * 1000:>8.3f} ms  p99 {percentile(times, 99) * 1000:>8.3f} ms")
+    if backtracks is not None:
+        line += f"  backtracks avg {sum(backtracks) / len(backtracks):.1f} max {max(backtracks)}"
+    print(line)
+
+
+def read_puzzles(path):
+    puzzles = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            solution = from_line(parts[1]) if len(parts) > 1 else None
+            puzzles.append((from_line(parts[0]), solution))
+    return puzzles
+
+
+def check(puzzle, solution=None):
+    box = int(round(len(puzzle) ** 0.5))
+    solver = Solver(puzzle, box=box)
+    count = solver.count_solutions(2)
+    if count == 0:
+        return "no solution"
+    if count > 1:
+        return "more than one solution"
+    # counting backs out of every solution it finds, so solve a fresh copy to compare
+    solver = Solver(puzzle, box=box)
+    if solution is not None and (not solver.solve() or solver.to_grid() != solution):
+        return "solution doesn't match"
+    return None
+
+
+def instrument(args):
+    if args.stats or args.trace:
+        return Instrument(trace=bool(args.trace))
+    return None
+
+
+def show_stats(args, instrument):
+    if instrument is None:
+        return
+    stats = instrument.report()
+    # stats go to stderr so they don't end up in a puzzle file piped from stdout
+    print(f"nodes {stats['nodes']}  backtracks {stats['backtracks']}  checks {stats['checks']}", file=sys.stderr)
+    for name, call in stats["calls"].items():
+        print(f"  {name:<14} {call['count']:>7} calls  {call['seconds'] * 1000:>10.1f} ms", file=sys.stderr)
+    if args.trace:
+        instrument.dump(args.trace)
+        print(f"{stats['trace_events']} trace events written to {args.trace}", file=sys.stderr)
+
+
+def generate(args):
+    out = open(args.output, "w") if args.output else sys.stdout
+    times = []
+    counter = instrument(args)
+    for seed in range(args.seed, args.seed + args.count):
+        grid = Grid(args.engine, seed=seed, difficulty=args.difficulty, symmetric=args.symmetric,
+                    instrument=counter, box=args.box)
+        times.append(grid.gen_time)
+        line = to_line(grid.grid)
+        if args.solutions:
+            line += " " + to_line(grid.solution)
+        print(line, file=out)
+    if out is not sys.stdout:
+        out.close()
+    report(f"generate {args.difficulty} {grid.size}x{grid.size}", times)
+    show_stats(args, counter)
+
+
+def solve(args):
+    times, backtracks = [], []
+    counter = instrument(args)
+    for puzzle, _ in read_puzzles(args.file):
+        grid = Grid(args.engine, puzzle=puzzle, instrument=counter)
+        start = time.perf_counter()
+        solved = grid.solve()
+        times.append(time.perf_counter() - start)
+        backtracks.append(grid.backtracks)
+        if not args.quiet:
+            print(to_line(grid.grid) if solved else "no solution")
+    report(f"solve {args.engine}", times, backtracks if args.engine == "bitset" else None)
+    show_stats(args, counter)
+
+
+def validate(args):
+    bad = 0
+    puzzles = read_puzzles(args.file)
+    # repeated digits in every puzzle and solution are found in one numpy call each
+    givens_ok = batch.validate([puzzle for puzzle, _ in puzzles])
+    solutions = [(number, solution) for number, (_, solution) in enumerate(puzzles) if solution is not None]
+    solutions_ok = {}
+    if solutions:
+        solutions_ok = dict(zip([number for number, _ in solutions],
+                                batch.validate([solution for _, solution in solutions], complete=True)))
+    for number, (puzzle, solution) in enumerate(puzzles):
+        if not givens_ok[number]:
+            problem = "givens repeat a digit"
+        elif not solutions_ok.get(number, True):
+            problem = "solution isn't a finished sudoku"
+        else:
+            problem = check(puzzle, solution)
+        if problem:
+            bad += 1
+            print(f"line {number + 1}: {problem}")
+    print(f"{len(puzzles) - bad}/{len(puzzles)} puzzles ok")
+    return 1 if bad else 0
+
+
+def bench(args):
+    puzzles = read_puzzles(args.corpus)[:args.limit]
+    engines = ["bitset", "classic"] if args.engine == "both" else [args.engine]
+    failed = 0
+    for engine in engines:
+        times, backtracks = [], []
+        for puzzle, solution in puzzles:
+            grid = Grid(engine, puzzle=puzzle)
+            start = time.perf_counter()
+            grid.solve()
+            times.append(time.perf_counter() - start)
+            backtracks.append(grid.backtracks)
+            if solution is not None and grid.grid != solution:
+                failed += 1
+        report(f"Grid.solve {engine}", times, backtracks if engine == "bitset" else None)
+
+        times, backtracks = [], []
+        for seed in range(args.fills):
+            grid = Grid(engine, seed=seed, puzzle=[[0] * 9 for _ in range(9)])
+            start = time.perf_counter()
+            grid.fill_tiles()
+            times.append(time.perf_counter() - start)
+            backtracks.append(grid.backtracks)
+        report(f"Grid.fill_tiles {engine}", times, backtracks if engine == "bitset" else None)
+
+    # there is no corpus for the bigger boards, so freshly built puzzles are solved instead
+    for box in args.boxes:
+        size = box * box
+        label = f"{size}x{size}"
+        times, backtracks, built = [], [], []
+        for seed in range(args.fills if box != 3 else 0):
+            grid = Grid(seed=seed, puzzle=[[0] * size for _ in range(size)])
+            start = time.perf_counter()
+            grid.fill_tiles()
+            times.append(time.perf_counter() - start)
+            backtracks.append(grid.backtracks)
+        if times:
+            report(f"fill_tiles {label}", times, backtracks)
+        times = []
+        for seed in range(args.generate):
+            grid = Grid(seed=seed, difficulty=args.difficulty, box=box)
+            times.append(grid.gen_time)
+            built.append(grid)
+        report(f"build_grid {args.difficulty} {label}", times)
+        clues = [sum(v != 0 for row in grid.grid for v in row) for grid in built]
+        print(f"{'':<22} clues avg {sum(clues) / len(clues):.0f} target {built[0].clues()}"
+              f"  time budget {built[0].time_budget:.1f}s")
+        times, backtracks = [], []
+        for grid in built:
+            start = time.perf_counter()
+            grid.solve()
+            times.append(time.perf_counter() - start)
+            backtracks.append(grid.backtracks)
+            if grid.grid != grid.solution:
+                failed += 1
+        report(f"solve {args.difficulty} {label}", times, backtracks)
+    if failed:
+        print(f"{failed} corpus puzzles solved wrong")
+    return 1 if failed else 0
+
+
+def pack(args):
+    store = PuzzleStore(args.store, box=args.box)
+    if store.box != args.box:
+        print(f"{args.store} holds {store.size}x{store.size} puzzles, pick another --store")
+        store.close()
+        return 1
+    seeds = range(args.seed, args.seed + args.count)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        puzzles = pool.map(make_puzzle, [args.engine] * args.count, [args.difficulty] * args.count,
+                           seeds, [args.box] * args.count, chunksize=64)
+        store.append(puzzles)
+    elapsed = time.perf_counter() - start
+    store.build_index()
+    print(f"packed {args.count} {args.difficulty} puzzles in {elapsed:.1f}s, "
+          + ", ".join(f"{d} {store.count(d)}" for d in DIFFICULTY) + f" in {args.store}")
+    store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless sudoku generator, solver and benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("generate", help="generate puzzles from consecutive seeds")
+    p.add_argument("-n", "--count", type=int, default=100)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--difficulty", choices=list(DIFFICULTY), default="easy")
+    p.add_argument("--symmetric", action="store_true")
+    p.add_argument("--box", type=int, choices=[3, 4, 5], default=3, help="inner box width, 4 for 16x16, 5 for 25x25")
+    p.add_argument("--engine", choices=["bitset", "classic"], default="bitset")
+    p.add_argument("--solutions", action="store_true", help="write the solution after each puzzle")
+    p.add_argument("-o", "--output")
+    p.add_argument("--stats", action="store_true", help="count search nodes, backtracks and checks")
+    p.add_argument("--trace", metavar="FILE", help="write every place, remove and dead end to FILE")
+    p.set_defaults(run=generate)
+
+    p = commands.add_parser("solve", help="solve every puzzle in a file")
+    p.add_argument("file")
+    p.add_argument("--engine", choices=["bitset", "classic"], default="bitset")
+    p.add_argument("-q", "--quiet", action="store_true", help="only print the timing")
+    p.add_argument("--stats", action="store_true", help="count search nodes, backtracks and checks")
+    p.add_argument("--trace", metavar="FILE", help="write every place, remove and dead end to FILE")
+    p.set_defaults(run=solve)
+
+    p = commands.add_parser("validate", help="check every puzzle has exactly one solution")
+    p.add_argument("file")
+    p.set_defaults(run=validate)
+
+    p = commands.add_parser("bench", help="time Grid.solve and Grid.fill_tiles")
+    p.add_argument("--corpus", default=CORPUS)
+    p.add_argument("--engine", choices=["bitset", "classic", "both"], default="bitset")
+    p.add_argument("--limit", type=int, default=None, help="only use the first LIMIT corpus puzzles")
+    p.add_argument("--fills", type=int, default=50, help="number of empty boards to fill")
+    p.add_argument("--boxes", type=int, nargs="+", choices=[3, 4, 5], default=[3],
+                   help="board sizes to build and solve puzzles for, by inner box width")
+    p.add_argument("--generate", type=int, default=3, help="number of puzzles to build for each size")
+    p.add_argument("--difficulty", choices=list(DIFFICULTY), default="hard")
+    p.set_defaults(run=bench)
+
+    p = commands.add_parser("pack", help="generate puzzles into a binary PuzzleStore")
+    p.add_argument("-n", "--count", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--difficulty", choices=list(DIFFICULTY), default="easy")
+    p.add_argument("--engine", choices=["bitset", "classic"], default="bitset")
+    p.add_argument("--store", default="puzzles.store")
+    p.add_argument("--box", type=int, choices=[3, 4, 5], default=3, help="inner box width, 4 for 16x16, 5 for 25x25")
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(run=pack)
+
+    args = parser.parse_args(argv)
+    return args.run(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,26 +6,59 @@
 ###########################################################
 
 import pygame
+import os
 import time
 import utilities
 from Play import Play
+from Board import Board
+from PuzzlePool import PuzzlePool
+from PuzzleStore import PuzzleStore
+from Popup import Popup
 
+# "bitset" uses the constraint propagation Solver, "classic" the
+# original backtracking Grid methods so the two can be compared
+ENGINE = "bitset"
+# "easy", "medium" or "hard", see DIFFICULTY in Grid.py
+DIFFICULTY = "easy"
+# inner box width, 3 for 9x9, 4 for 16x16 or 5 for 25x25
+# digits past 9 are typed with the letters A-P
+BOX = 3
+# first seed the puzzle pool hands out, the pool carries on from its cache
+SEED = 0
+# puzzles packed with `python cli.py pack`, new games are read from here
+# when it has puzzles of the difficulty and come from the pool otherwise
+STORE = "puzzles.store"
+# frame cap while something on the board is changing
+FPS = 60
+# prints the rects and surfaces allocated for every frame that redraws
+DEBUG = False
+# also saves the end of game popup to popup.png with PIL
+EXPORT_POPUP = False
+# seconds the end of game popup stays up before a new game starts
+RESET_DELAY = 10
 
 """
 Functions
 ---------
 
     def end_game() : 
-        draws a popup called from utilities that generates a message
-        and tells the player how long it took to solve the game
+        builds the in game popup that tells the player how long it took
+        to solve the game, and exports it with utilities when EXPORT_POPUP is set
         
-    def draw_screen() : 
-        fills the background black and writes the game rules to the screen
-        and calls utiliites to begin the clock timer
+    def new_grid() : 
+        picks a random puzzle from the store when it holds BOX sized puzzles,
+        or takes one from the pool
+
+    def idle_timeout() : 
+        milliseconds until the clock shows the next second, used to
+        sleep on the event queue while nothing on the board is changing
+
+    def main() : 
+        sets up pygame and the puzzle pool and runs the game loop
 
 """
 
-def end_game(gameTime):
+def end_game(gameTime, center):
     content = [
         {"text":" ",'font_size':20,'align':'left','color':'white'},
         {"text":" ",'font_size':20,'align':'center','color':'white'},
@@ -33,145 +66,167 @@ def end_game(gameTime):
         {"text":"  ",'font_size':20,'align':'center','color':'white'},
         {"text":f"       You Finished in: {gameTime}",'font_size':20,'align':'left','color':'white'},
     ]
-    image = utilities.makePopUp(content,border_size=10,border_color='white',fill_color='black',width=600,height=300)
-    image.show()
-    image.save(f"popup.png")
-
-def draw_screen(window, play, time):
-    # this fill the background of the game in black
-    # overlays texts that explains how to play the game 
-    # and shows a game clock for the user
-    window.fill((0, 0, 0))
-    font = pygame.font.Font("fonts/Futura.ttf", 32)
-    # call utilities.set_time to set the clock in the game  
-    text = font.render("Clock " + utilities.set_time(time), 1,(0,255,255))
-    window.blit(text, (680, 400))
-    font = pygame.font.Font("fonts/Futura.ttf", 28)
-    text = font.render("SUDOKU RULES", 1, (255, 255, 0))
-    window.blit(text, (540+130,100))
-    font = pygame.font.Font("fonts/Futura.ttf", 16)
-    text = font.render("1. Each row must contain the numbers 1-9 exactly once each",1, (255, 128, 0))                
-    window.blit(text, (540+10 ,140))
-    text = font.render("2. Each column must contain the numbers 1-9 exactly once each", 1, (255, 0, 0))
-    window.blit(text, (540+10 ,160))
-    text = font.render("3. Each 3x3 play must contain the numbers 1-9 exactly once each",1, (255, 0, 127))
-    window.blit(text, (540+10 ,180))
-    font = pygame.font.Font("fonts/Futura.ttf", 28)
-    text = font.render("GAME PLAY", 1, (255, 0, 255))
-    window.blit(text, (540+150,245))
-    font = pygame.font.Font("fonts/Futura.ttf", 18)
-    text = font.render("Select a blank tile to play a value", 1, (127, 0, 255))
-    window.blit(text, (540+30,280))
-    text = font.render("Press ENTER to set the value in the display", 1, (0, 0, 255))
-    window.blit(text, (540+30,300))
-    text = font.render("Press BACKSPACE to remove the value and try again", 1, (0, 127,255))
-    window.blit(text, (540+30,320))       
-    play.draw(window)
-    
-    
-#initialize pygame module
-pygame.init()
-
-#add background music to game
-pygame.mixer.init()
-pygame.mixer.music.load('music/lofi_falling.mp3')
-pygame.mixer.music.set_volume(0.05)
-pygame.mixer.music.play(-1)
-
-#sets the size of the whole background module
-display = pygame.display.set_mode((1050, 545))
-pygame.display.set_caption("SUDOKU 4 U")
-
-# calls the Play class to set the game play display
-play = Play(540, 540, display)
-running = True
-pressed = None
-start = time.time()
-
-# while the game is running
-while running:
-    
-    #get the current time to be used later   
-    current_time = round(time.time() - start)
-    # sets running to false if game is quit
-    for e in pygame.event.get():
-        if e.type == pygame.QUIT:
-            running = False
-        # KEYDOWN event gets the keys from funtion in utilities
-        if e.type == pygame.KEYDOWN:
-            if utilities.get_key(e.key) is not None:
-                # sets the event of a key 1-9 to pressed 
-                pressed = utilities.get_key(e.key)
-            
-            elif e.key == pygame.K_BACKSPACE:
-                # clears the indivual tile when backspace event happens
-                play.clear()
-                #sets pressed to none
-                pressed = None
-                
-            elif e.key == pygame.K_RETURN:
-                #selects the x,y cooridinate when you enter RETURN to set the value
-                x, y = play.selected
-                # sets the location of the value you played and passes in pressed key
-                play.location(pressed)
-                # plays a chime when a correct input value is played on the board
-                if play.check_blank_tile() is False and play.check_solution() is True:
-                    pygame.mixer.Channel(0).set_volume(0.15)
-                    pygame.mixer.Channel(0).play(pygame.mixer.Sound('music/success-chime.mp3'))
-                    #print(x,y,pressed)
-                    if not play.check_correct(x,y,pressed):
-                        pygame.mixer.Channel(0).set_volume(0.3)
-                        pygame.mixer.Channel(0).play(pygame.mixer.Sound('music/f-cked-up_.mp3'))
-                    
-                # when you've solved the game correctly
-                if play.check_blank_tile() is False and play.check_solution() is False:
-                    # get the current time and store it in gameTime
-                    gameTime = utilities.set_time(current_time) 
-                    #call end_game function to create the popup
-                    end_game(gameTime)
-                    #pause the background music
-                    pygame.mixer.music.pause()
-                    #play the winning soung called from utilites
-                    utilities.win_sound()
-                    
-                    # tell game to wait 10 seconds before reset
-                    pygame.time.wait(10000)
-     ###### this will automatically setup a new game ######
-                    #restart background music called from utillites
-                    utilities.background_music()
-                    #reset the current time to 0
-                    current_time = 0
-                    #create a new starting time
-                    start = time.time()
-                    # tell Play class to draw a new board
-                    play = Play(540, 540, display)
-                    #reset pressed to none
+    if EXPORT_POPUP:
+        image = utilities.makePopUp(content,border_size=10,border_color='white',fill_color='black',width=600,height=300)
+        image.save(f"popup.png")
+    return Popup(content, center, border_size=10, border_color='white', fill_color='black', width=600, height=300)
+
+def new_grid(store, pool):
+    if store is not None and store.box == BOX and store.count(DIFFICULTY):
+        return store.random(DIFFICULTY)
+    return pool.get(DIFFICULTY)
+
+def idle_timeout(start):
+    return 1000 - int((time.time() - start) * 1000) % 1000
+
+
+def main():
+    #initialize pygame module
+    pygame.init()
+
+    #add background music to game
+    pygame.mixer.init()
+    pygame.mixer.music.load('music/lofi_falling.mp3')
+    pygame.mixer.music.set_volume(0.05)
+    pygame.mixer.music.play(-1)
+
+    #sets the size of the whole background module
+    display = pygame.display.set_mode((1050, 545))
+    pygame.display.set_caption("SUDOKU 4 U")
+
+    # keeps puzzles ready in worker processes so a new game starts instantly
+    pool = PuzzlePool(engine=ENGINE, seed=SEED, box=BOX)
+    store = PuzzleStore(STORE) if os.path.exists(STORE) else None
+    # calls the Play class to set the game play display
+    play = Play(540, 540, display, grid=new_grid(store, pool))
+    # the Board caches the rules and grid lines and only redraws what changed
+    board = Board(display, play)
+    clock = pygame.time.Clock()
+    idle = False
+    # when the last game was won, the popup stays up until RESET_DELAY has passed
+    won_at = None
+    running = True
+    pressed = None
+    start = time.time()
+
+    # while the game is running
+    while running:
+
+        ###### this will automatically setup a new game ######
+        if won_at is not None and time.time() - won_at >= RESET_DELAY:
+            won_at = None
+            board.hide_popup()
+            #restart background music called from utillites
+            utilities.background_music()
+            #create a new starting time
+            start = time.time()
+            # tell Play class to draw a new board
+            play = Play(540, 540, display, grid=new_grid(store, pool))
+            board.set_play(play)
+            #reset pressed to none
+            pressed = None
+
+        #get the current time to be used later, the clock stops while the popup is up
+        if won_at is None:
+            current_time = round(time.time() - start)
+        events = pygame.event.get()
+        # nothing changed last frame, so sleep until there's an event
+        # or it's time to tick the clock over instead of spinning
+        if not events and idle:
+            e = pygame.event.wait(idle_timeout(start))
+            if e.type != pygame.NOEVENT:
+                events = [e]
+            if won_at is None:
+                current_time = round(time.time() - start)
+        # sets running to false if game is quit
+        for e in events:
+            if e.type == pygame.QUIT:
+                running = False
+            # the board is finished, ignore input until the next game starts
+            if won_at is not None:
+                continue
+            # KEYDOWN event gets the keys from funtion in utilities
+            if e.type == pygame.KEYDOWN:
+                if utilities.get_key(e.key, play.size) is not None:
+                    # sets the event of a key 1-9 to pressed 
+                    pressed = utilities.get_key(e.key, play.size)
+
+                elif e.key in (pygame.K_p, pygame.K_TAB):
+                    # P is the digit 25 on a 25x25 board, so TAB works too
+                    # show or hide the candidates of every blank tile
+                    play.toggle_pencil()
+
+                elif e.key == pygame.K_BACKSPACE:
+                    # clears the indivual tile when backspace event happens
+                    play.clear()
+                    #sets pressed to none
                     pressed = None
-        # this gets the postion of a mouse click event 
-        if e.type == pygame.MOUSEBUTTONDOWN:
-            pos = pygame.mouse.get_pos()
-            #print(pos)
-            # sets clicked to click funtion in Play class
-            clicked = play.click(pos)
-            
-            # if a mouse button click is detected
-            if clicked:
-                # call the Play class to hightlight the individual tile
-                play.select(clicked[0], clicked[1])
-                # call the Play class to highlight the row and column where the mouse click is detected 
-                play.highlightRow(clicked[0])
-                play.highlightCol(clicked[1])
-                pressed = None
-    #if somewhere is seleced and an even button is pressed          
-    if play.selected and pressed is not None:
-            #set a temporary location calling the Play class
-            play.temp_location(pressed)
-    #call the draw_screen function and pass in the necessary params    
-    draw_screen(display, play, current_time)
-    # update the pygame display
-    pygame.display.update()
-
-
-pygame.quit()
-            
-                    
\ No newline at end of file
+
+                elif e.key == pygame.K_RETURN and play.selected and pressed is not None:
+                    #selects the x,y cooridinate when you enter RETURN to set the value
+                    x, y = play.selected
+                    # sets the location of the value you played and passes in pressed key
+                    play.location(pressed)
+                    # Play keeps the blanks and repeated digits up to date as values
+                    # are set, so checking the board doesn't re-solve it
+                    unsolved = play.check_solution()
+                    # plays a chime when a correct input value is played on the board
+                    if unsolved:
+                        pygame.mixer.Channel(0).set_volume(0.15)
+                        pygame.mixer.Channel(0).play(pygame.mixer.Sound('music/success-chime.mp3'))
+                        #print(x,y,pressed)
+                        if not play.check_correct(x,y,pressed):
+                            pygame.mixer.Channel(0).set_volume(0.3)
+                            pygame.mixer.Channel(0).play(pygame.mixer.Sound('music/f-cked-up_.mp3'))
+
+                    # when you've solved the game correctly
+                    else:
+                        # get the current time and store it in gameTime
+                        gameTime = utilities.set_time(current_time) 
+                        #call end_game function to draw the popup over the board
+                        board.show_popup(end_game(gameTime, display.get_rect().center))
+                        #pause the background music
+                        pygame.mixer.music.pause()
+                        #play the winning soung called from utilites
+                        utilities.win_sound()
+                        # the game resets RESET_DELAY seconds from now without blocking the window
+                        won_at = time.time()
+            # this gets the postion of a mouse click event 
+            if e.type == pygame.MOUSEBUTTONDOWN:
+                pos = pygame.mouse.get_pos()
+                #print(pos)
+                # sets clicked to click funtion in Play class
+                clicked = play.click(pos)
+
+                # if a mouse button click is detected
+                if clicked:
+                    # call the Play class to hightlight the individual tile
+                    play.select(clicked[0], clicked[1])
+                    # call the Play class to highlight the row and column where the mouse click is detected 
+                    play.highlightRow(clicked[0])
+                    play.highlightCol(clicked[1])
+                    pressed = None
+        #if somewhere is seleced and an even button is pressed          
+        if play.selected and pressed is not None:
+                #set a temporary location calling the Play class
+                play.temp_location(pressed)
+        # redraw whatever changed and pass only those rects to the display
+        rects = board.draw(current_time)
+        if rects:
+            pygame.display.update(rects)
+            if DEBUG:
+                print(f"redrew {len(rects)} rects, {board.allocations} surface allocations")
+        idle = not rects
+        clock.tick(FPS)
+
+
+    # save the spare puzzles for next time
+    pool.close()
+    if store is not None:
+        store.close()
+    print(f"puzzle pool hits: {pool.hits} misses: {pool.misses}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
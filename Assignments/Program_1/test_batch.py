@@ -0,0 +1,32 @@
+#############################################################
+# Leslie Cook
+# Sudoku Pygame
+# 5443 - 2D gaming
+# Griffin - Spring 23
+# Checks the batch module's candidates against the Solver's
+# for every board size, run with python -m pytest
+#############################################################
+import batch
+from Grid import Grid
+from Solver import Solver
+
+
+def check_candidates(box):
+    grid = Grid(seed=1, box=box, time_budget=0)
+    marks = batch.candidates(grid.grid)[0]
+    solver = Solver(grid.grid, box=box)
+    size = box * box
+    for i in range(size * size):
+        assert int(marks[i // size][i % size]) == (solver.candidates(i) if solver.cells[i] == 0 else 0)
+
+
+def test_candidates_9x9():
+    check_candidates(3)
+
+
+def test_candidates_16x16():
+    check_candidates(4)
+
+
+def test_candidates_25x25():
+    check_candidates(5)
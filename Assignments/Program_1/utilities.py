@@ -10,7 +10,7 @@
 # and a popup generator created by Dr. G
 #############################################################
 import pygame
-from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
 '''
 Functions
 ---------
@@ -18,6 +18,7 @@ Functions
     def get_key() :
         switch case function
         creates dictionary of 1-9 values from the keyboard input
+        and the letters A-P for 10-25 on the bigger boards
 
      def set_time() : 
         takes in seconds converts to minutes
@@ -33,12 +34,17 @@ Functions
         
     ## from Griffin ##
     
+    def load_font() :
+        loads a PIL font once and reuses it for every later call
+    
     def get_font_size() :
     
     def makePopUp() : 
+        builds the popup as a PIL image, the game draws its popup with the
+        Popup class and only uses this to export popup.png
       
 '''
-def get_key(key):
+def get_key(key, size=9):
     #switch case for keybord input
     switch = {
         pygame.K_1: 1,
@@ -51,7 +57,11 @@ def get_key(key):
         pygame.K_8: 8,
         pygame.K_9: 9,
     }
-    return switch.get(key, None)
+    # A is 10 up to P for 25, the same letters Grid.DIGITS writes
+    if pygame.K_a <= key < pygame.K_a + size - 9:
+        return key - pygame.K_a + 10
+    value = switch.get(key, None)
+    return value if value is not None and value <= size else None
 
 def set_time(sec):
     seconds = sec % 60
@@ -76,6 +86,12 @@ def win_sound():
     pygame.mixer.music.play(0)
 
 
+@lru_cache(maxsize=None)
+def load_font(font_name, size):
+    # PIL is only needed to export popups so it is imported on first use
+    from PIL import ImageFont
+    return ImageFont.truetype(font_name, size)
+
 def get_font_size(text, font_name, pixel_size):
     """This returns the "font size" necessary to fit a letter in an image
     of a given pixel size. Different letters have different widths and
@@ -90,12 +106,13 @@ def get_font_size(text, font_name, pixel_size):
     font_size = 20
     h = 0
     while h < pixel_size:
-        font = ImageFont.truetype(font_name, font_size)
+        font = load_font(font_name, font_size)
         w, h = font.getbbox(text)
         font_size += 2
     return font_size, w, h
 
 def makePopUp(content,**kwargs):
+    from PIL import Image, ImageDraw
 
     width = kwargs.get("width", 300)
     height = kwargs.get("height", 300)
@@ -134,7 +151,7 @@ def makePopUp(content,**kwargs):
             line['font_name'] = font_name
 
         #font_size, font_width, font_height = get_font_size(line['text'], line['font_name'], line['font_size'])
-        font = ImageFont.truetype(line['font_name'], size=line['font_size'])
+        font = load_font(line['font_name'], line['font_size'])
         
         if not 'color' in line:
             color = "black"
@@ -0,0 +1,141 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import os
+import time
+import pygame
+
+"""
+    Pre-baked animation frames for one knight
+
+    Every frame of every action is loaded from disk once, smoothscaled to
+    each size the game draws it at, flipped for the left facing version and
+    given its collision mask up front. The game loop then only looks frames
+    up by (action, frame, size, inverted) and never touches the disk, scales
+    or builds a mask while playing.
+
+    When the knight comes from a sprite pack (python SpritePack.py) the frames
+    are already scaled and are cut out of a single decoded image instead.
+"""
+class AnimationAtlas:
+
+    ## Atlases already built, keyed by knight name and sizes, so a reset
+    ## that picks the same knight again doesn't load it a second time
+    atlases = {}
+
+    ## Single images like the thrown spear, keyed by (path, size, inverted)
+    images = {}
+
+    ## Smaller copies of frames for drawing at a render scale below 1, keyed by (full size image, scale).
+    ## The full size frames and masks stay what the simulation uses
+    drawnImages = {}
+
+    ## Actions drawn at the player sizes, the Weapon frames are drawn at the projectile size
+    PLAYER_ACTIONS = ["Attack", "Die", "Idle", "Jump", "Move", "Hurt", "Blood"]
+
+    def __init__(self, spriteObject, playerSizes, projectileSize):
+        start = time.perf_counter()
+        self.name = spriteObject["Name"]
+        self.frames = {}
+        self.frameCounts = {}
+        self.surfaceCount = 0
+
+        if not self.loadPack(spriteObject, playerSizes, projectileSize):
+            for action in self.PLAYER_ACTIONS:
+                self.loadAction(spriteObject, action, playerSizes)
+            self.loadAction(spriteObject, "Weapon", [projectileSize])
+
+        self.loadTime = time.perf_counter() - start
+        source = "sprite pack" if "Pack" in spriteObject and self.surfaceCount else "sprite folders"
+        print(f'AnimationAtlas {self.name}: {self.surfaceCount} frames from {source} pre-scaled, flipped and masked '
+              f'in {self.loadTime * 1000:.0f} ms')
+
+    @classmethod
+    def get(cls, spriteObject, playerSizes, projectileSize):
+        key = (spriteObject["Name"], tuple(playerSizes), projectileSize)
+        if key not in cls.atlases:
+            cls.atlases[key] = cls(spriteObject, playerSizes, projectileSize)
+        return cls.atlases[key]
+
+    @classmethod
+    def image(cls, imgLink, smsc_dimensions, inverted=False):
+        key = (imgLink, smsc_dimensions, inverted)
+        if key not in cls.images:
+            cls.images[key] = cls.bake(cls.loadImage(imgLink), smsc_dimensions, inverted)
+        return cls.images[key]
+
+    ## The image to draw for a full size frame at a render scale
+    @classmethod
+    def drawn(cls, image, scale):
+        if scale == 1:
+            return image
+        key = (image, scale)
+        if key not in cls.drawnImages:
+            width, height = image.get_size()
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            cls.drawnImages[key] = pygame.transform.smoothscale(image, size)
+        return cls.drawnImages[key]
+
+    ## Makes every frame's render scale copy up front so none are scaled while playing
+    def prescale(self, scale):
+        for image, mask in self.frames.values():
+            AnimationAtlas.drawn(image, scale)
+
+    ## Cuts every frame out of the knight's packed image, returns False when there
+    ## is no pack or it wasn't built for the sizes the game wants
+    def loadPack(self, spriteObject, playerSizes, projectileSize):
+        if "Pack" not in spriteObject:
+            return False
+        wanted = {(action, tuple(size)) for action in self.PLAYER_ACTIONS for size in playerSizes}
+        wanted |= {("Weapon", tuple(projectileSize))}
+        frames = [f for f in spriteObject["Pack"]["frames"] if (f["action"], tuple(f["size"])) in wanted]
+        if {(f["action"], tuple(f["size"])) for f in frames} != wanted:
+            return False
+
+        packed = self.loadImage(spriteObject["Pack"]["image"])
+        for f in frames:
+            image = packed.subsurface(f["rect"])
+            for inverted in (False, True):
+                self.frames[(f["action"], f["frame"], tuple(f["size"]), inverted)] = self.bake(image, tuple(f["size"]), inverted)
+                self.surfaceCount += 1
+            self.frameCounts[f["action"]] = max(self.frameCounts.get(f["action"], 0), f["frame"] + 1)
+        return True
+
+    ## Loads every numbered frame of an action, only the frames
+    ## the game asks for by number (0.png, 1.png ...) are kept
+    def loadAction(self, spriteObject, action, sizes):
+        imagePath = spriteObject["Action"][action]["imagePath"]
+        count = 0
+        while os.path.isfile(f'{imagePath}/{count}.png'):
+            original = self.loadImage(f'{imagePath}/{count}.png')
+            for size in sizes:
+                ## scaling is the slow part so the flipped copy is made from the scaled image
+                scaled = pygame.transform.smoothscale(original, size)
+                for inverted in (False, True):
+                    self.frames[(action, count, size, inverted)] = self.bake(scaled, size, inverted)
+                    self.surfaceCount += 1
+            count += 1
+        self.frameCounts[action] = count
+
+    @staticmethod
+    def loadImage(imgLink):
+        image = pygame.image.load(imgLink)
+        ## convert_alpha needs a window, without one the image is used as loaded
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        return image
+
+    ## Same steps GameSprite used to do every frame: smoothscale, flip when
+    ## the sprite faces left, then the mask for collisions
+    @staticmethod
+    def bake(image, smsc_dimensions, inverted=False):
+        if image.get_size() != smsc_dimensions:
+            image = pygame.transform.smoothscale(image, smsc_dimensions)
+        if inverted:
+            image = pygame.transform.flip(image, True, False)
+        return (image, pygame.mask.from_surface(image))
+
+    def frame(self, action, index, smsc_dimensions, inverted=False):
+        return self.frames[(action, index, smsc_dimensions, inverted)]
@@ -15,12 +15,22 @@
 
 """
 
+import argparse
+import collections
 import pygame
 import pprint
 import copy
 import os
+import random
+import time
+import zlib
+from AnimationAtlas import AnimationAtlas
+from FrameProfiler import FrameProfiler
+from InputLog import InputLog, MAX_SEED
 from PlayerSelection import PlayerSelector
-from PIL import Image, ImageDraw
+from ProjectilePool import ProjectilePool
+from Rollback import MAX_WINDOW, RollbackSession, UDPTransport
+from VoiceManager import VoiceManager
 import utilities
 
 
@@ -44,23 +54,18 @@ class Background(pygame.sprite.Sprite):
     def __init__(self, image_file, location, size):
 
         pygame.sprite.Sprite.__init__(self)
-        self.width, self.height = self.getImgWidthHeight(image_file)
         self.image = pygame.image.load(image_file)
+        self.width, self.height = self.image.get_size()
+
+        ## Scaled and converted to the window's pixel format once, every
+        ## blit of it after that is a straight copy
         self.image = pygame.transform.scale(self.image, size)
+        if pygame.display.get_surface() is not None:
+            self.image = self.image.convert()
 
         self.rect = self.image.get_rect()
         self.rect.left, self.rect.top = location
 
-    def getImgWidthHeight(self, path):
-        """Uses pil to image size in pixels.
-        Params:
-            path (string) : path to the image
-        """
-        if os.path.isfile(path):
-            im = Image.open(path)
-            return im.size
-        return None
-
 ###################################################################################################
 """
   ██████╗  █████╗ ███╗   ███╗███████╗        
@@ -79,37 +84,30 @@ class Background(pygame.sprite.Sprite):
 
 """
 class GameSprite(pygame.sprite.Sprite):
-    def __init__(self, imgLink, location, smsc_dimensions, inverted=False):
+
+    ## Built from an (image, mask) frame out of an AnimationAtlas
+    ## so nothing is loaded, scaled or masked while the game is running
+    def __init__(self, frame, location):
         self.playerMain = pygame.sprite.Sprite()
         self.location = location
-        self.playerMain.image = self.__makeImage(imgLink, smsc_dimensions, inverted)
+        self.playerMain.image, self.playerMain.mask = frame
         self.playerMain.rect = self.playerMain.image.get_rect(center = location)
-        self.playerMain.mask = pygame.mask.from_surface(self.playerMain.image)
         
-    def draw(self):
-        screen.blit(self.playerMain.image, self.playerMain.rect.topleft)
+    ## location is the center to draw at when it isn't where the rect is,
+    ## like a position interpolated between two simulation ticks.
+    ## scale is the render scale surface is drawn at
+    def draw(self, surface, location=None, scale=1.0):
+        if location is None and scale == 1:
+            return surface.blit(self.playerMain.image, self.playerMain.rect.topleft)
+        if location is None:
+            location = self.playerMain.rect.center
+        image = AnimationAtlas.drawn(self.playerMain.image, scale)
+        return surface.blit(image, image.get_rect(center = (location[0] * scale, location[1] * scale)).topleft)
         
     def move(self, x, y):
         self.rect.x += x
         self.rect.y += y
         
-    def changeImage(self, imgLink, smsc_dimensions, inverted=False):
-        self.playerMain.image = self.__makeImage(imgLink, smsc_dimensions, inverted)
-        
-    def __makeImage(self, imgLink, smsc_dimensions, inverted=False):
-        if not inverted:
-            image = pygame.image.load(imgLink)
-            image = pygame.transform.smoothscale(image, smsc_dimensions)
-
-        ## Inverted case where the Sprite is facing left
-        else:
-            image = pygame.image.load(imgLink)
-            image = pygame.transform.smoothscale(image, smsc_dimensions)
-            image_Copy = image.copy()
-            image = pygame.transform.flip(image_Copy, True, False)
-            
-        return image
-
 ###################################################################################################
 """
  ██████╗ ██╗      █████╗ ██╗   ██╗███████╗██████╗ 
@@ -120,9 +118,18 @@ class GameSprite(pygame.sprite.Sprite):
  ╚═╝     ╚══════╝╚═╝  ╚═╝   ╚═╝   ╚══════╝╚═╝  ╚═╝                        
 """
 class Player:
-    def __init__(self, SP, P):
+
+    ## Everything a simulation tick can change, saved and restored for rollback.
+    ## The sprites are shared (image, mask) frames so keeping a reference is enough
+    SNAPSHOT = ("player_X", "player_Y", "previous_X", "previous_Y", "Crouching", "Standing", "Jumping",
+                "Descending", "Moving", "Hurt", "Dead", "Attacking", "Jump_Height", "idle_frame",
+                "jump_frame", "death_frame", "move_frame", "hurt_frame", "attack_frame", "blood_frame",
+                "throwCooldown", "sprite", "bloodSprite")
+
+    def __init__(self, SP, P, atlas):
         self.StartingPosition = SP
         self.spriteObject = P
+        self.atlas = atlas
         self.player_X = SP[0]
         self.player_Y = SP[1]
         self.Crouching = False
@@ -155,17 +162,23 @@ class Player:
         self.blood_frame = 0
         self.name = P["Screen Name"]
 
+        ## The frame the player is showing and its position last tick,
+        ## the renderer draws in between the two
+        self.sprite = None
+        self.bloodSprite = None
+        self.previous_X = self.player_X
+        self.previous_Y = self.player_Y
+
+        ## Animation frames until the player can throw another spear
+        self.throwCooldown = 0
+
     ## When the player has been killed
     def playerDeathAnimation(self,AOFDSS,Inverted=False):
         if self.Dead == True:
-            P_link = f'{self.spriteObject["Action"]["Die"]["imagePath"]}/{self.death_frame}.png'
-            Player = GameSprite(P_link, 
-                                (self.player_X, self.player_Y), AOFDSS, Inverted)
-            P_blood = f'{self.spriteObject["Action"]["Blood"]["imagePath"]}/{self.blood_frame}.png'
-            Player_blood = GameSprite(P_blood, 
-                                (self.player_X, self.player_Y), AOFDSS, Inverted)
-            Player_blood.draw()
-            Player.draw()
+            self.sprite = GameSprite(self.atlas.frame("Die", self.death_frame, AOFDSS, Inverted),
+                       (self.player_X, self.player_Y))
+            self.bloodSprite = GameSprite(self.atlas.frame("Blood", self.blood_frame, AOFDSS, Inverted),
+                       (self.player_X, self.player_Y))
            
             if self.death_frame < self.death_frameCount - 1:
                 self.death_frame += 1
@@ -176,13 +189,13 @@ class Player:
                 self.Jump_Height -= 10
                 self.player_Y += 10
     
-    ## Handling whether the Player is Standing or the Player is Moving
+    ## Handling whether the Player is Standing or the Player is Moving,
+    ## steps the animation only, draw() puts it on screen
     def movePlayer(self,AOFDSS,Inverted=False,AOFVS=15,AOFJH=150,AOFPS=10):
         if self.Dead == False:
             if self.Attacking == True:
-                P_link = f'{self.spriteObject["Action"]["Attack"]["imagePath"]}/{self.attack_frame}.png'
-                Player = GameSprite(P_link, 
-                                (self.player_X, self.player_Y), AOFDSS, Inverted)
+                Player = GameSprite(self.atlas.frame("Attack", self.attack_frame, AOFDSS, Inverted),
+                       (self.player_X, self.player_Y))
                 if self.attack_frame < self.attack_frameCount - 1:
                     self.attack_frame += 1
                 else:
@@ -190,9 +203,8 @@ class Player:
                     self.Attacking = False
 
             if self.Hurt == True:
-                P_link = f'{self.spriteObject["Action"]["Hurt"]["imagePath"]}/{self.hurt_frame}.png'
-                Player = GameSprite(P_link, 
-                                (self.player_X, self.player_Y), AOFDSS, Inverted)
+                Player = GameSprite(self.atlas.frame("Hurt", self.hurt_frame, AOFDSS, Inverted),
+                       (self.player_X, self.player_Y))
 
                 if self.hurt_frame < self.hurt_frameCount - 1:
                     self.hurt_frame += 1
@@ -205,13 +217,11 @@ class Player:
             ## animates idle standing if the sprite isn't attacking or taking damage
             if self.Standing == True and self.Attacking == False and self.Hurt == False:
                 if self.Moving == False:
-                    P_link = f'{self.spriteObject["Action"]["Idle"]["imagePath"]}/{self.idle_frame}.png'
-                    Player = GameSprite(P_link, 
-                                        (self.player_X, self.player_Y), AOFDSS, Inverted)
+                    Player = GameSprite(self.atlas.frame("Idle", self.idle_frame, AOFDSS, Inverted),
+                               (self.player_X, self.player_Y))
                 else:
-                    P_link = f'{self.spriteObject["Action"]["Move"]["imagePath"]}/{self.move_frame}.png'
-                    Player = GameSprite(P_link, 
-                                        (self.player_X, self.player_Y), AOFDSS, Inverted)
+                    Player = GameSprite(self.atlas.frame("Move", self.move_frame, AOFDSS, Inverted),
+                               (self.player_X, self.player_Y))
                     if self.move_frame < self.move_frameCount - 1:
                         self.move_frame += 1
                     else:
@@ -219,9 +229,8 @@ class Player:
                 self.Moving = False
 
             if self.Jumping == True:
-                P_link = f'{self.spriteObject["Action"]["Jump"]["imagePath"]}/{self.jump_frame}.png'
-                Player = GameSprite(P_link, 
-                                (self.player_X, self.player_Y), AOFDSS, Inverted)
+                Player = GameSprite(self.atlas.frame("Jump", self.jump_frame, AOFDSS, Inverted),
+                       (self.player_X, self.player_Y))
                 if self.Descending == False:
                     if self.jump_frame < self.jump_frameCount -1:
                         self.jump_frame += 1
@@ -241,9 +250,41 @@ class Player:
                         self.Jumping = False
                         self.Standing = True
                         self.jump_frame = 0
-        Player.draw()
+        self.sprite = Player
         return Player
 
+    def saveState(self):
+        return tuple([getattr(self, name) for name in self.SNAPSHOT])
+
+    def loadState(self, state):
+        for name, value in zip(self.SNAPSHOT, state):
+            setattr(self, name, value)
+        self.placeSprite()
+
+    ## Remembers where the player was before a simulation tick moves them
+    def savePosition(self):
+        self.previous_X = self.player_X
+        self.previous_Y = self.player_Y
+
+    ## Keeps the collision rect on the player when they moved on a tick that didn't step the animation
+    def placeSprite(self):
+        if self.sprite is not None:
+            self.sprite.playerMain.rect.center = (self.player_X, self.player_Y)
+
+    ## alpha is how far the renderer is between the last tick (0) and the current one (1),
+    ## scale is the render scale surface is drawn at. Returns the rects it drew over
+    def draw(self, surface, alpha=1.0, scale=1.0):
+        if self.sprite is None:
+            return []
+        location = (self.previous_X + (self.player_X - self.previous_X) * alpha,
+                    self.previous_Y + (self.player_Y - self.previous_Y) * alpha)
+        rects = []
+        ## bloodSprite is made by the first death animation step after the killing tick
+        if self.Dead == True and self.bloodSprite is not None:
+            rects.append(self.bloodSprite.draw(surface, location, scale))
+        rects.append(self.sprite.draw(surface, location, scale))
+        return rects
+
 ###################################################################################################
 """ 
   ██████╗  █████╗ ███╗   ███╗███████╗                                                 
@@ -262,7 +303,7 @@ class Player:
                                                                                       
 """
 class GameController:
-    def __init__(self, width, height):
+    def __init__(self, width, height, seed=None):
         self.Running = True
         self.screenWidth = width
         self.screenHeight = height
@@ -286,22 +327,553 @@ class GameController:
         self.TAN = (255,255,204)
         self.P1 = ""
         self.P2 = ""
+        self.frameCost = 0
+        self.frameBlitBytes = 0
+        self.frameCostCount = 0
+        self.blitBytes = 0
+        self.fullRedraw = True
+
+        ## The speeds above and every animation were made for 60 frames a second,
+        ## the simulation runs at TICK_RATE and scales the speeds to match
+        self.ANIMATION_RATE = 60
+        self.TICK_RATE = 60
+        self.tickScale = 1.0
+
+        ## A slow frame never makes the simulation catch up more than this many seconds
+        self.MAX_FRAME_TIME = 0.25
+
+        self.tick = 0
+        self.ticks = 0
+        self.animationClock = 1.0
+        self.headless = False
+        self.resetRequested = False
+
+        ## Replaced by an enabled FrameProfiler when the frame phases should be timed
+        self.profiler = FrameProfiler(enabled=False)
+
+        ## Set while a rollback replays ticks so their sounds don't play a second time
+        self.muted = False
+
+        ## Set to a VoiceManager once the mixer is up, until then nothing is played
+        self.sounds = None
+
+        ## Every knight selection comes from this seed so a recorded game picks the same knights again
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.P1_Inverted = False
+        self.P2_Inverted = True
+        self.screen = None
+
+        ## The scene is drawn onto canvas at renderScale of the window's size and scaled
+        ## up to the window once a frame. At 1 the canvas is the window itself
+        self.renderScale = 1.0
+        self.canvas = None
+
+        ## Window pixels per canvas pixel when that's a whole number, then the canvas can be
+        ## scaled up a dirty rect at a time and come out the same as scaling all of it
+        self.pixelSize = 1
+
+        ## Every spear in the air comes out of one pool, a player can have
+        ## PROJECTILES_PER_PLAYER up at once and throws one every THROW_COOLDOWN frames
+        self.MAX_PROJECTILES = 64
+        self.PROJECTILES_PER_PLAYER = 32
+        self.THROW_COOLDOWN = 20
+        self.projectiles = ProjectilePool(self.MAX_PROJECTILES, self.PROJECTILES_PER_PLAYER,
+                                          self.Projectile_Smoothscale_Dimensions, checkForHorizontalCollisions)
 
     def getScreenSize(self):
         dimensions = (self.screenWidth, self.screenHeight)
         return dimensions
+
+    def getCanvasSize(self):
+        return (self.toCanvas(self.screenWidth), self.toCanvas(self.screenHeight))
+
+    ## A window or game length in canvas pixels
+    def toCanvas(self, length):
+        return max(1, round(length * self.renderScale))
     
     def loadPlayers(self):
         C4 = PlayerSelector()
-        sprites = C4.chooseSprites()
-        self.P1 = Player((600, 500), sprites[0])
-        self.P2 = Player((1270, 500), sprites[1])
+        sprites = C4.chooseSprites(self.rng.randrange(2**32))
+        self.P1 = Player((600, 500), sprites[0], self.loadAtlas(sprites[0]))
+        self.P2 = Player((1270, 500), sprites[1], self.loadAtlas(sprites[1]))
+        self.setCaption()
+        self.fullRedraw = True
+
+    ## Set the title of the window
+    def setCaption(self):
+        if self.screen is not None and self.P1 and self.P2:
+            banner = f'Get Ready for Deadliest Warrior! {self.P1.name} vs {self.P2.name}'
+            pygame.display.set_caption(banner)
+
+    ## Every size a knight is drawn at gets baked into its atlas up front,
+    ## and the render scale copies of the frames too when there is a window
+    def loadAtlas(self, spriteObject):
+        atlas = AnimationAtlas.get(spriteObject,
+                                   [self.Default_Smoothscale_Dimensions, self.Crouching_Smoothscale_Dimensions],
+                                   self.Projectile_Smoothscale_Dimensions)
+        if self.canvas is not None and self.renderScale != 1:
+            atlas.prescale(self.renderScale)
+            for imgLink in ('Projectiles/spear_LTR.png', 'Projectiles/spear_RTL.png'):
+                image, mask = AnimationAtlas.image(imgLink, self.Projectile_Smoothscale_Dimensions)
+                AnimationAtlas.drawn(image, self.renderScale)
+        return atlas
+
+    ## Window, background, fonts and reset button, the headless mode never calls this.
+    ## Called before loadPlayers the knights' frames are converted to the window's pixel format too.
+    ## renderScale below 1 draws everything at that fraction of the window's size and scales it up
+    def setupDisplay(self, renderScale=1.0):
+        self.screen = pygame.display.set_mode(self.getScreenSize())
+        self.renderScale = renderScale
+        if renderScale == 1:
+            self.canvas = self.screen
+        else:
+            self.canvas = pygame.Surface(self.getCanvasSize()).convert()
+        pixelSize = round(1 / renderScale)
+        self.pixelSize = pixelSize if abs(1 / renderScale - pixelSize) < 1e-6 else None
+
+        ## Setting the background image and orienting starting from (0,0) origin i.e top left corner
+        self.BackGround = Background("Arena_Night.jpg", [0, 0], self.getCanvasSize())
+        self.setCaption()
+
+        ## Fonts are made once, the health and winner text only get rendered again when they change
+        self.Health_font = pygame.font.SysFont('Algerian', self.toCanvas(30))
+        self.Winner_font = pygame.font.SysFont('Algerian', self.toCanvas(100))
+        self.textCache = {}
+
+        ## Reset Button stuff, the rect is on the canvas so clicks are mapped to it in handleEvents
+        button_font = pygame.font.SysFont('Algerian', self.toCanvas(50))
+        self.button_text = button_font.render("RESET", True, self.TAN)
+        self.button_rect = self.button_text.get_rect()
+        self.button_rect.center = (self.toCanvas(self.screenWidth // 2), self.toCanvas(self.screenHeight - 200))
+
+        ## Rects drawn over last frame and this frame, only those parts of
+        ## the window are put back to the background and sent to the display
+        self.lastRects = []
+        self.dirtyRects = []
+        self.fullRedraw = True
+        self.blitBytes = 0
+
+    ## Averages how long the simulation and drawing take each frame and how
+    ## many bytes the blits wrote, prints them every 10 seconds of game time
+    def logFrameCost(self, seconds):
+        self.frameCost += seconds
+        self.frameBlitBytes += self.blitBytes
+        self.frameCostCount += 1
+        if self.frameCostCount == self.FPS * 10:
+            print(f'update and draw: {self.frameCost / self.frameCostCount * 1000:.2f} ms per frame, '
+                  f'{self.frameBlitBytes / self.frameCostCount / 1024:.0f} KB blitted per frame')
+            self.frameCost = 0
+            self.frameBlitBytes = 0
+            self.frameCostCount = 0
 
     def resetGame(self):
         self.right_health = 10
         self.left_health = 10
+        self.projectiles.clear()
         self.loadPlayers()
 
+    ## Sounds are skipped in the headless mode and when there is no VoiceManager
+    def playSound(self, name, volume=None):
+        if self.headless or self.sounds is None or self.muted:
+            return
+        self.sounds.play(name, volume)
+
+    ## The music stops while a player is dead, skipped like the sounds so a rollback
+    ## calls it once it's done instead of for every tick it runs again
+    def syncMusic(self):
+        if self.headless or self.muted or not pygame.mixer.get_init():
+            return
+        if self.P1.Dead or self.P2.Dead:
+            pygame.mixer.music.pause()
+        else:
+            pygame.mixer.music.unpause()
+
+    """
+        Runs the game until the window is closed
+
+            - hz is the simulation rate, the game plays at the same speed whatever
+              it is set to and however fast frames are drawn
+            - Every drawn frame runs as many fixed ticks as the time since the last
+              frame calls for then draws the players part way between their last two ticks
+            - headless runs ticks back to back without a window, sound or drawing,
+              ticks stops it after that many ticks
+            - record is an InputLog every tick's keys are added to
+            - replay is an InputLog to take the keys from instead of the keyboard,
+              it runs at the log's tick rate until the log runs out
+            - frames stops it after that many drawn frames
+    """
+    def run(self, hz=None, headless=False, ticks=None, record=None, replay=None, frames=None, session=None):
+        if replay is not None:
+            hz = replay.hz
+            ticks = len(replay) if ticks is None else min(ticks, len(replay))
+        self.TICK_RATE = hz or self.TICK_RATE
+        self.tickScale = self.ANIMATION_RATE / self.TICK_RATE
+        self.headless = headless
+        step = 1 / self.TICK_RATE
+
+        if headless:
+            ## No keyboard without a window so nobody is pressing anything
+            keys, reset = collections.defaultdict(bool), False
+            while self.Running and (ticks is None or self.ticks < ticks):
+                start = time.perf_counter()
+                self.profiler.begin()
+                if replay is not None:
+                    keys, reset = replay.keys(self.ticks)
+                self.tickInput(keys, reset, record)
+                self.profiler.endFrame()
+                self.logFrameCost(time.perf_counter() - start)
+            self.finishRecording(record)
+            return
+
+        accumulator = 0.0
+        previous = time.perf_counter()
+        frame = 0
+        while self.Running and (ticks is None or self.ticks < ticks) and (frames is None or frame < frames):
+            self.clock.tick(self.FPS)
+            now = time.perf_counter()
+            accumulator += min(now - previous, self.MAX_FRAME_TIME)
+            previous = now
+
+            self.profiler.begin()
+            self.handleEvents()
+            keys = pygame.key.get_pressed()
+            self.profiler.mark("events")
+            start = time.perf_counter()
+            while accumulator >= step and (ticks is None or self.ticks < ticks):
+                reset, self.resetRequested = self.resetRequested, False
+                if session is not None:
+                    ## No reset in netplay, both machines would have to agree on the tick it was clicked
+                    session.advance(keys)
+                else:
+                    if replay is not None:
+                        keys, reset = replay.keys(self.ticks)
+                    self.tickInput(keys, reset, record)
+                accumulator -= step
+            self.render(accumulator / step)
+            self.logFrameCost(time.perf_counter() - start)
+            self.dirtyRects += self.profiler.drawOverlay(self.canvas)
+            self.profiler.mark("overlay")
+            self.present()
+            self.profiler.count("blit_bytes", self.blitBytes)
+            self.profiler.mark("flip")
+            self.profiler.endFrame()
+            frame += 1
+        self.finishRecording(record)
+
+    ## Runs one tick, through the recording when there is one so the game
+    ## plays exactly what a replay of it will see
+    def tickInput(self, keys, reset, record):
+        if record is not None:
+            keys = record.record(keys, reset)
+        if reset:
+            self.resetGame()
+        self.update(keys)
+
+    def finishRecording(self, record):
+        if record is not None:
+            record.digest = self.stateDigest()
+
+    ## The whole simulation as one tuple, loadState puts it back exactly.
+    ## Takes a few microseconds so a rollback can keep one for every tick
+    def saveState(self):
+        return (self.ticks, self.tick, self.animationClock, self.left_health, self.right_health,
+                self.P1_Inverted, self.P2_Inverted, self.P1.saveState(), self.P2.saveState(),
+                self.projectiles.saveState())
+
+    def loadState(self, state):
+        (self.ticks, self.tick, self.animationClock, self.left_health, self.right_health,
+         self.P1_Inverted, self.P2_Inverted, P1, P2, projectiles) = state
+        self.P1.loadState(P1)
+        self.P2.loadState(P2)
+        self.projectiles.loadState(projectiles)
+
+    ## A checksum of everything the simulation decides, two games that
+    ## played out the same way end with the same digest
+    def stateDigest(self):
+        state = [self.ticks, self.tick, self.left_health, self.right_health]
+        for P in (self.P1, self.P2):
+            state += [P.name, P.player_X, P.player_Y, P.Jump_Height, P.Jumping, P.Descending, P.Dead,
+                      P.Hurt, P.Attacking, P.throwCooldown, P.idle_frame, P.move_frame, P.jump_frame,
+                      P.attack_frame, P.hurt_frame, P.death_frame]
+        for p in self.projectiles.active:
+            state += [p.X, p.Y, p.direction, p.frame]
+        return zlib.crc32(repr(state).encode())
+
+    def handleEvents(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.Running = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                self.fullRedraw = True
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                ## The button is on the canvas, the click is in window pixels
+                x, y = event.pos
+                if self.button_rect.collidepoint(x * self.renderScale, y * self.renderScale):
+                    # Reset the game on the next tick so a recording sees it happen
+                    self.resetRequested = True
+                    utilities.background_music() 
+
+    ## One fixed simulation tick
+    def update(self, keys):
+        self.P1.savePosition()
+        self.P2.savePosition()
+        self.handleKeys(keys)
+        self.profiler.mark("input")
+
+        """
+            Handles where if the sprites walk past each other, they will flip their directions
+        """
+        if self.P1.player_X > (self.P2.player_X + 25):
+            self.P1_Inverted = True
+            self.P2_Inverted = False
+        else:
+            self.P1_Inverted = False
+            self.P2_Inverted = True
+
+        ## The animations step at ANIMATION_RATE whatever the tick rate is
+        self.animationClock += self.tickScale
+        while self.animationClock >= 1:
+            self.animate()
+            self.animationClock -= 1
+        self.P1.placeSprite()
+        self.P2.placeSprite()
+        self.profiler.mark("animation")
+
+        for target in self.projectiles.update(self.PROJECTILE_VELOCITY * self.tickScale):
+            self.hitPlayer(target)
+        self.profiler.mark("projectiles")
+        self.ticks += 1
+
+    def handleKeys(self, keys):
+        speed = self.PLAYER_SPEED * self.tickScale
+
+        ## Player 1 key controls
+        if keys[pygame.K_a]:
+            self.P1.Moving = True
+            self.playSound("footsteps")
+            P1_Collision = checkForHorizontalCollisions(self.P1.player_X - speed)
+            if P1_Collision == False and self.P1.Dead == False:
+                self.P1.player_X -= speed
+        if keys[pygame.K_d]:
+            self.P1.Moving = True
+            self.playSound("footsteps")
+            P1_Collision = checkForHorizontalCollisions(self.P1.player_X + speed)
+            if P1_Collision == False and self.P1.Dead == False:
+                self.P1.player_X += speed
+        if keys[pygame.K_w]:
+            if self.P1.Standing == True and self.P1.Dead == False:
+                self.playSound("jump")
+                self.P1.Jumping = True
+                self.P1.Standing = False
+        if keys[pygame.K_LSHIFT]:
+            if self.P1.throwCooldown == 0 and self.P1.Dead == False:
+                self.throwSpear(self.P1, self.P2, 'Projectiles/spear_LTR.png', self.P1_Inverted)
+        if keys[pygame.K_s]:
+                self.P1.Crouching = True
+
+        ## Player 2 key controls
+        if keys[pygame.K_LEFT]:
+            self.P2.Moving = True
+            self.playSound("footsteps")
+            P2_Collision = checkForHorizontalCollisions(self.P2.player_X - speed)
+            if P2_Collision == False and self.P2.Dead == False:
+                self.P2.player_X -= speed
+        if keys[pygame.K_RIGHT]:
+            self.P2.Moving = True
+            self.playSound("footsteps")
+            P2_Collision = checkForHorizontalCollisions(self.P2.player_X + speed)
+            if P2_Collision == False and self.P2.Dead == False:
+                self.P2.player_X += speed
+        if keys[pygame.K_UP]:
+            if self.P2.Standing == True and self.P2.Dead == False:
+                self.P2.Jumping = True
+                self.playSound("jump", 0.01)
+                self.P2.Standing = False
+        if keys[pygame.K_RSHIFT]:
+            if self.P2.throwCooldown == 0 and self.P2.Dead == False:
+                self.throwSpear(self.P2, self.P1, 'Projectiles/spear_RTL.png', self.P2_Inverted)
+        if keys[pygame.K_DOWN]:
+            self.P2.Crouching = True
+
+    def throwSpear(self, thrower, target, imgLink, inverted):
+        if self.projectiles.throw(thrower, target, imgLink, inverted) is None:
+            return
+        self.playSound("throw")
+        thrower.Attacking = True
+        thrower.throwCooldown = self.THROW_COOLDOWN
+
+    ## One frame of every animation, the game used to do this once per drawn frame
+    def animate(self):
+        ## So the idle frames aren't cracked out
+        if self.tick % 3 == 0:
+            for P in (self.P1, self.P2):
+                if P.idle_frame < P.idle_frameCount - 1:
+                    P.idle_frame += 1
+                else:
+                    P.idle_frame = 0
+        self.profiler.mark("idle")
+
+        """
+            Either the player is dead and animate the death slides or they
+            are still alive in which case start animating the player sprite based
+            on the conditions captured from key input.
+        """
+        for P, Inverted in ((self.P1, self.P1_Inverted), (self.P2, self.P2_Inverted)):
+            if P.Dead == True:
+                P.playerDeathAnimation(self.Default_Smoothscale_Dimensions, Inverted)
+            elif P.Crouching == True:
+                P.movePlayer(self.Crouching_Smoothscale_Dimensions, Inverted)
+                P.Crouching = False
+            else:
+                P.movePlayer(self.Default_Smoothscale_Dimensions, Inverted)
+
+            if P.throwCooldown > 0:
+                P.throwCooldown -= 1
+        self.projectiles.animate()
+        self.tick += 1
+
+    def hitPlayer(self, target):
+        self.playSound("hit", 0.05 if target is self.P2 else 0.1)
+        target.Hurt = True
+        if target is self.P2:
+            if self.right_health > 0:
+                self.right_health -= 3
+            health = self.right_health = max(self.right_health, 0)
+        else:
+            if self.left_health > 0:
+                self.left_health -= 3
+            health = self.left_health = max(self.left_health, 0)
+
+        if health <= 0:
+            target.Dead = True
+            self.playSound("death", 0.1 if target is self.P2 else 0.05)
+            self.syncMusic()
+            self.playSound("fanfare", 0.05 if target is self.P2 else 0.03)
+
+    ## Draws the current state, alpha is how far between the last two ticks the players are drawn.
+    ## Only what was drawn over last frame is put back to the background, present() then
+    ## sends those rects and this frame's to the display instead of the whole window
+    def render(self, alpha=1.0):
+        screen = self.canvas
+        scale = self.renderScale
+        background = self.BackGround.image
+        self.dirtyRects = []
+        self.blitBytes = 0
+
+        ## Layering background image of map imagery, all of it only when the whole window is redrawn
+        if self.fullRedraw:
+            self.countBlit(screen.blit(background, self.BackGround.rect))
+        else:
+            for rect in self.lastRects:
+                self.countBlit(screen.blit(background, rect, rect))
+        self.profiler.mark("background")
+
+        """
+            Health Bar Stuff
+
+                - Left Health = Player1
+                - Right Health = Player2
+                - Color coded health:
+                    - Green = Good
+                    - Yellow = Mid
+                    - Red = Low
+        """
+        right_health_text = self.renderText(self.Health_font,
+                "Player 2 Health: " + str(self.right_health), self.healthColor(self.right_health))
+        left_health_text = self.renderText(self.Health_font,
+                "Player 1 Health: " + str(self.left_health), self.healthColor(self.left_health))
+        
+        self.draw(right_health_text, (screen.get_width() - right_health_text.get_width() - self.toCanvas(120),
+                                      self.toCanvas(10)))
+        self.draw(left_health_text, (self.toCanvas(120), self.toCanvas(10)))
+        self.profiler.mark("hud")
+
+        for rect in self.P1.draw(screen, alpha, scale):
+            self.dirtyRects.append(self.countBlit(rect))
+        if self.P1.Dead == True:
+            self.drawWinner("Player 2 Wins")
+        for rect in self.P2.draw(screen, alpha, scale):
+            self.dirtyRects.append(self.countBlit(rect))
+        if self.P2.Dead == True:
+            self.drawWinner("Player 1 Wins")
+
+        for rect in self.projectiles.draw(screen, alpha, scale):
+            self.dirtyRects.append(self.countBlit(rect))
+
+        if self.right_health <= 0 or self.left_health <= 0:
+            # Draw the reset button and wait for the player to click it
+            self.dirtyRects.append(self.countBlit(pygame.draw.rect(screen, (255, 0, 0), self.button_rect)))
+            self.draw(self.button_text, self.button_rect)
+        self.profiler.mark("sprites")
+
+    ## Sends this frame to the display, only the dirty rects unless the whole window was redrawn.
+    ## A scaled down canvas is scaled up into the window first, only its dirty rects when the
+    ## scale is 1/2, 1/3 ... and all of it at any other scale
+    def present(self):
+        if self.canvas is not self.screen and self.pixelSize is None:
+            pygame.transform.scale(self.canvas, self.getScreenSize(), self.screen)
+            self.countBlit(self.screen.get_rect(), self.screen)
+            self.fullRedraw = True
+        if self.fullRedraw:
+            if self.canvas is not self.screen and self.pixelSize is not None:
+                self.upscale(self.canvas.get_rect())
+            pygame.display.flip()
+            self.fullRedraw = False
+        else:
+            rects = self.lastRects + self.dirtyRects
+            if self.canvas is not self.screen:
+                rects = [self.upscale(rect) for rect in rects]
+            pygame.display.update(rects)
+        self.lastRects = self.dirtyRects
+
+    ## Scales one canvas rect up into the window, returns the window rect it covers
+    def upscale(self, rect):
+        rect = rect.clip(self.canvas.get_rect())
+        if rect.width == 0 or rect.height == 0:
+            return pygame.Rect(0, 0, 0, 0)
+        size = self.pixelSize
+        windowRect = pygame.Rect(rect.x * size, rect.y * size, rect.width * size, rect.height * size)
+        if self.screen.get_rect().contains(windowRect):
+            ## Straight into the window, no surface in between
+            pygame.transform.scale(self.canvas.subsurface(rect), windowRect.size, self.screen.subsurface(windowRect))
+            return self.countBlit(windowRect, self.screen)
+        ## The canvas is a little bigger than the window when the window isn't a multiple of size
+        image = pygame.transform.scale(self.canvas.subsurface(rect), windowRect.size)
+        return self.countBlit(self.screen.blit(image, windowRect), self.screen)
+
+    ## Blits onto the canvas and remembers the rect as dirty
+    def draw(self, image, location):
+        rect = self.canvas.blit(image, location)
+        self.dirtyRects.append(self.countBlit(rect))
+        return rect
+
+    ## Adds the bytes a blit wrote to this frame's count
+    def countBlit(self, rect, surface=None):
+        surface = self.canvas if surface is None else surface
+        self.blitBytes += rect.width * rect.height * surface.get_bytesize()
+        return rect
+
+    def healthColor(self, health):
+        if health > 7:
+            return self.GREEN
+        elif health <= 7 and health > 3:
+            return self.YELLOW
+        else:
+            return self.RED
+
+    ## Text only gets rendered the first time it's shown
+    def renderText(self, font, text, color):
+        key = (font, text, color)
+        if key not in self.textCache:
+            self.textCache[key] = font.render(text, 1, color)
+        return self.textCache[key]
+
+    def drawWinner(self, text):
+        draw_text = self.renderText(self.Winner_font, text, self.TAN)
+        self.draw(draw_text, (self.canvas.get_width()/2 - draw_text.get_width() /
+                2, self.canvas.get_height()/2 - draw_text.get_height()/2))
+
 
 ###################################################################################################
 """
@@ -330,14 +902,6 @@ def checkForHorizontalCollisions(currentX):
     else:
         return False
 
-## Mask Collision Detection between Sprites and Projectiles
-def checkForProjectileCollision(sprite, projectile):
-    result = pygame.sprite.collide_mask(sprite.playerMain, projectile.playerMain)
-    if result != None:
-        return True
-    else:
-        return False
-
 ###################################################################################################
 """
   ██████╗  █████╗ ███╗   ███╗███████╗                                
@@ -355,48 +919,69 @@ def checkForProjectileCollision(sprite, projectile):
    ╚═══╝  ╚═╝  ╚═╝╚═╝  ╚═╝╚═╝╚═╝  ╚═╝╚═════╝ ╚══════╝╚══════╝╚══════╝                                                                   
  """
 
-## Initialize Pygame Stuff
-pygame.init()
-pygame.font.init()
-pygame.mixer.init()
-pygame.mixer.set_num_channels(7)
-utilities.background_music()
-running = True
-
 ## Rough Dimensions of Byron's Monitor
 screenWidth = 1750
 screenHeight = 800
 
-## New Game Controller Object
-AOFW = GameController(screenWidth, screenHeight)
-
-## Set the size of the window using the above dimensions
-size = (screenWidth, screenHeight)
-screen = pygame.display.set_mode(size)
-
-## Setting the background image and orienting starting from (0,0) origin i.e top left corner
-BackGround = Background("Arena_Night.jpg", [0, 0], (screenWidth, screenHeight))
-
-AOFW.loadPlayers()
-
-## Set the title of the window
-banner = f'Get Ready for Deadliest Warrior! {AOFW.P1.name} vs {AOFW.P2.name}'
-pygame.display.set_caption(banner)
-
-## Control variables for when sprites cross over each other
-P1_Inverted = False
-P2_Inverted = True
-
-tick = 0
-
-## Reset Button stuff
-button_font = pygame.font.SysFont('Algerian', 50)
-button_text = button_font.render("RESET", True, AOFW.TAN)
-button_rect = button_text.get_rect()
-button_rect.center = (screenWidth // 2, screenHeight - 200)
-
-###################################################################################################
-"""
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Art of War")
+    parser.add_argument("--hz", type=int, default=60, help="simulation ticks per second")
+    parser.add_argument("--headless", action="store_true", help="run the simulation only, no window, sound or drawing")
+    parser.add_argument("--ticks", type=int, help="stop after this many simulation ticks")
+    parser.add_argument("--seed", type=int, help="seed for picking the knights, 0 to 2**32 - 1")
+    parser.add_argument("--record", metavar="FILE", help="save every tick's keys to FILE when the game ends")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded game headless and check it ends the same")
+    parser.add_argument("--profile", metavar="CSV", help="time every frame phase and write them to CSV at exit")
+    parser.add_argument("--overlay", action="store_true", help="draw the rolling phase percentiles on screen")
+    parser.add_argument("--frames", type=int, help="stop after this many drawn frames")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="draw at this fraction of the window's resolution and scale it up, 0.5 draws a quarter of the pixels")
+    parser.add_argument("--netplay", type=int, choices=[1, 2], help="play this player against --peer over UDP")
+    parser.add_argument("--port", type=int, default=5443, help="UDP port to listen on for netplay")
+    parser.add_argument("--peer", metavar="HOST:PORT", help="the other player's machine")
+    parser.add_argument("--input-delay", type=int, default=2, help="netplay ticks before a key press takes effect")
+    parser.add_argument("--max-rollback", type=int, default=8, help="most netplay ticks to roll back before waiting")
+    args = parser.parse_args()
+
+    if args.seed is not None and not 0 <= args.seed <= MAX_SEED:
+        parser.error(f"--seed must be 0 to {MAX_SEED}")
+    if not 0 < args.render_scale <= 1:
+        parser.error("--render-scale must be above 0 and at most 1")
+
+    if args.netplay:
+        if args.peer is None or args.seed is None:
+            parser.error("--netplay needs --peer and the same --seed on both machines")
+        if args.headless or args.record or args.replay:
+            parser.error("--netplay can't be used with --headless, --record or --replay")
+        if args.input_delay < 0 or args.max_rollback < 0 or args.max_rollback + args.input_delay > MAX_WINDOW // 2:
+            parser.error(f"--max-rollback plus --input-delay must be 0 to {MAX_WINDOW // 2}")
+
+    replay = InputLog.load(args.replay) if args.replay else None
+    if replay is not None:
+        ## A replay being profiled is drawn, under the dummy driver unless one was picked
+        args.headless = args.headless or not args.profile
+        args.seed = replay.seed
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    ## Initialize Pygame Stuff
+    pygame.init()
+    pygame.font.init()
+    if not args.headless and os.environ.get("SDL_VIDEODRIVER") != "dummy":
+        pygame.mixer.init()
+        utilities.background_music()
+
+    ## New Game Controller Object
+    AOFW = GameController(screenWidth, screenHeight, args.seed)
+    if pygame.mixer.get_init():
+        AOFW.sounds = VoiceManager(channels=7)
+    if not args.headless:
+        AOFW.setupDisplay(args.render_scale)
+    AOFW.loadPlayers()
+    if args.profile or args.overlay:
+        AOFW.profiler = FrameProfiler(overlay=args.overlay)
+
+    ###################################################################################################
+    """
   ██████╗  █████╗ ███╗   ███╗███████╗    ██╗      ██████╗  ██████╗ ██████╗ 
  ██╔════╝ ██╔══██╗████╗ ████║██╔════╝    ██║     ██╔═══██╗██╔═══██╗██╔══██╗
  ██║  ███╗███████║██╔████╔██║█████╗      ██║     ██║   ██║██║   ██║██████╔╝
@@ -404,278 +989,30 @@ button_rect.center = (screenWidth // 2, screenHeight - 200)
  ╚██████╔╝██║  ██║██║ ╚═╝ ██║███████╗    ███████╗╚██████╔╝╚██████╔╝██║     
   ╚═════╝ ╚═╝  ╚═╝╚═╝     ╚═╝╚══════╝    ╚══════╝ ╚═════╝  ╚═════╝ ╚═╝                                                                             
 """
-## Run the game loop
-while running:
-    AOFW.clock.tick(AOFW.FPS)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if button_rect.collidepoint(event.pos):
-                # Reset the game
-                AOFW.resetGame()
-                utilities.background_music() 
-                
-    if AOFW.right_health <= 0 or AOFW.left_health <= 0:
-            # Draw the reset button and wait for the player to click it
-            pygame.draw.rect(screen, (255, 0, 0), button_rect)
-            screen.blit(button_text, button_rect)
-            pygame.display.update()
-    ## Get the pressed keys
-    keys = pygame.key.get_pressed()
-
-    ## Player 1 key controls
-    if keys[pygame.K_a]:
-        AOFW.P1.Moving = True
-        pygame.mixer.Channel(6).set_volume(0.05)
-        pygame.mixer.Channel(6).play(pygame.mixer.Sound('fight_sounds/metal-plate.wav'))
-        P1_Collision = checkForHorizontalCollisions(AOFW.P1.player_X - AOFW.PLAYER_SPEED)
-        if P1_Collision == False and AOFW.P1.Dead == False:
-            AOFW.P1.player_X -= AOFW.PLAYER_SPEED
-    if keys[pygame.K_d]:
-        AOFW.P1.Moving = True
-        pygame.mixer.Channel(6).set_volume(0.05)
-        pygame.mixer.Channel(6).play(pygame.mixer.Sound('fight_sounds/metal-plate.wav'))
-        P1_Collision = checkForHorizontalCollisions(AOFW.P1.player_X + AOFW.PLAYER_SPEED)
-        if P1_Collision == False and AOFW.P1.Dead == False:
-            AOFW.P1.player_X += AOFW.PLAYER_SPEED
-    if keys[pygame.K_w]:
-        if AOFW.P1.Standing == True and AOFW.P1.Dead == False:
-            pygame.mixer.Channel(6).set_volume(0.04)
-            pygame.mixer.Channel(6).play(pygame.mixer.Sound('fight_sounds/sword-hit-in-battle.wav'))
-            AOFW.P1.Jumping = True
-            AOFW.P1.Standing = False
-    if keys[pygame.K_LSHIFT]:
-        if AOFW.P1.Projectile == False and AOFW.P1.Dead == False:
-            AOFW.P1.Projectile = True
-            pygame.mixer.Channel(1).set_volume(0.07)
-            pygame.mixer.Channel(1).play(pygame.mixer.Sound('fight_sounds/fighting-mans-voice.wav'))
-            AOFW.P1.Attacking = True
-            P1_Spear_X = AOFW.P1.player_X
-            P1_Spear_Y = AOFW.P1.player_Y
-            P1_Spear = GameSprite('Projectiles/spear_LTR.png',
-                                  (P1_Spear_X, P1_Spear_Y), AOFW.Projectile_Smoothscale_Dimensions, False)
-            P1_Spear.draw()
-    if keys[pygame.K_s]:
-            AOFW.P1.Crouching = True
-
-    ## Player 2 key controls
-    if keys[pygame.K_LEFT]:
-        AOFW.P2.Moving = True
-        pygame.mixer.Channel(6).set_volume(0.05)
-        pygame.mixer.Channel(6).play(pygame.mixer.Sound('fight_sounds/metal-plate.wav'))
-        P2_Collision = checkForHorizontalCollisions(AOFW.P2.player_X - AOFW.PLAYER_SPEED)
-        if P2_Collision == False and AOFW.P2.Dead == False:
-            AOFW.P2.player_X -= AOFW.PLAYER_SPEED
-    if keys[pygame.K_RIGHT]:
-        AOFW.P2.Moving = True
-        pygame.mixer.Channel(6).set_volume(0.05)
-        pygame.mixer.Channel(6).play(pygame.mixer.Sound('fight_sounds/metal-plate.wav'))
-        P2_Collision = checkForHorizontalCollisions(AOFW.P2.player_X + AOFW.PLAYER_SPEED)
-        if P2_Collision == False and AOFW.P2.Dead == False:
-            AOFW.P2.player_X += AOFW.PLAYER_SPEED
-    if keys[pygame.K_UP]:
-        if AOFW.P2.Standing == True and AOFW.P2.Dead == False:
-            AOFW.P2.Jumping = True
-            pygame.mixer.Channel(0).set_volume(0.01)
-            pygame.mixer.Channel(0).play(pygame.mixer.Sound('fight_sounds/sword-hit-in-battle.wav'))
-            AOFW.P2.Standing = False
-    if keys[pygame.K_RSHIFT]:
-        if AOFW.P2.Projectile == False and AOFW.P2.Dead == False:
-            pygame.mixer.Channel(1).set_volume(0.07)
-            pygame.mixer.Channel(1).play(pygame.mixer.Sound('fight_sounds/fighting-mans-voice.wav'))
-            AOFW.P2.Projectile = True
-            AOFW.P2.Attacking = True
-            P2_Spear_X = AOFW.P2.player_X
-            P2_Spear_Y = AOFW.P2.player_Y
-            P2_Spear = GameSprite('Projectiles/spear_RTL.png',
-                                  (P2_Spear_X, P2_Spear_Y), AOFW.Projectile_Smoothscale_Dimensions, False)
-            P2_Spear.draw()
-    if keys[pygame.K_DOWN]:
-        AOFW.P2.Crouching = True
-
-    """
-        Handles where if the sprites walk past each other, they will flip their directions
-    """
-    if AOFW.P1.player_X > (AOFW.P2.player_X + 25):
-        P1_Inverted = True
-        P2_Inverted = False
-    else:
-        P1_Inverted = False
-        P2_Inverted = True
-        
-
-    ## "I want you to paint it, paint it, paint it black"
-    screen.fill(AOFW.BLACK)
-
-    ## Layering background image of map imagery
-    screen.blit(BackGround.image, BackGround.rect)
-
-    ## Game Banner
-    font = pygame.font.SysFont('Algerian',50)
-    # text = font.render("Are You Not Entertained?", 1, AOFW.TAN)
-
-    # screen.blit(text, (screenWidth/3,70))
-
-    """
-        Health Bar Stuff
-
-            - Left Health = Player1
-            - Right Health = Player2
-            - Color coded health:
-                - Green = Good
-                - Yellow = Mid
-                - Red = Low
-    """
-    Health_font = pygame.font.SysFont('Algerian', 30)
-
-    ## Right Health Bar conditionals
-    if AOFW.right_health > 7:
-        right_health_text = Health_font.render(
-                "Player 2 Health: " + str(AOFW.right_health), 1, AOFW.GREEN)
-    elif AOFW.right_health <= 7 and AOFW.right_health > 3:
-        right_health_text = Health_font.render(
-                "Player 2 Health: " + str(AOFW.right_health), 1, AOFW.YELLOW)
-    else:
-        right_health_text = Health_font.render(
-                "Player 2 Health: " + str(AOFW.right_health), 1, AOFW.RED)
-        
-    ## Left Health Bar conditionlas
-    if AOFW.left_health > 7:
-        left_health_text = Health_font.render(
-                "Player 1 Health: " + str(AOFW.left_health), 1, AOFW.GREEN)
-    elif AOFW.left_health <= 7 and AOFW.left_health > 3:
-        left_health_text = Health_font.render(
-                "Player 1 Health: " + str(AOFW.left_health), 1, AOFW.YELLOW)
-    else:
-        left_health_text = Health_font.render(
-                "Player 1 Health: " + str(AOFW.left_health), 1, AOFW.RED)
-    
-    screen.blit(right_health_text, (screenWidth - right_health_text.get_width() - 120, 10))
-    screen.blit(left_health_text, (120, 10))
-    
-    
-    ## So the idle frames aren't cracked out
-    if tick % 3 == 0:
-        if AOFW.P1.idle_frame < AOFW.P1.idle_frameCount - 1:
-            AOFW.P1.idle_frame += 1
-        else:
-            AOFW.P1.idle_frame = 0
-        if AOFW.P2.idle_frame < AOFW.P2.idle_frameCount - 1:
-            AOFW.P2.idle_frame += 1
-        else:
-            AOFW.P2.idle_frame = 0
-
-    """
-        Either the player is dead and animate the death slides or they
-        are still alive in which case start animating the player sprite based
-        on the conditions captured from key input.
-    """
-    if AOFW.P1.Dead == True:
-        AOFW.P1.playerDeathAnimation(AOFW.Default_Smoothscale_Dimensions,P1_Inverted)
-        Winner_font = pygame.font.SysFont('Algerian', 100)
-        draw_text = Winner_font.render("Player 2 Wins", 1, AOFW.TAN)
-        screen.blit(draw_text, (screenWidth/2 - draw_text.get_width() /
-                2, screenHeight/2 - draw_text.get_height()/2))
-    
-    elif AOFW.P1.Crouching == True:
-        Player1 = AOFW.P1.movePlayer(AOFW.Crouching_Smoothscale_Dimensions,P1_Inverted)
-        AOFW.P1.Crouching = False
-    else:
-        Player1 = AOFW.P1.movePlayer(AOFW.Default_Smoothscale_Dimensions,P1_Inverted)
-
-    if AOFW.P2.Dead == True:
-        AOFW.P2.playerDeathAnimation(AOFW.Default_Smoothscale_Dimensions,P2_Inverted)
-        Winner_font = pygame.font.SysFont('Algerian', 100)
-        draw_text = Winner_font.render("Player 1 Wins", 1, AOFW.TAN)
-        screen.blit(draw_text, (screenWidth/2 - draw_text.get_width() /
-                2, screenHeight/2 - draw_text.get_height()/2))
-        
-    elif AOFW.P2.Crouching == True:
-        Player2 = AOFW.P2.movePlayer(AOFW.Crouching_Smoothscale_Dimensions,P2_Inverted)
-        AOFW.P2.Crouching = False
-    else:
-        Player2 = AOFW.P2.movePlayer(AOFW.Default_Smoothscale_Dimensions,P2_Inverted)
-
-
-    ## Animation of Player 1's projectiles
-    if AOFW.P1.Projectile == True:
-        if P2_Inverted == True:
-            P1_Spear_X += AOFW.PROJECTILE_VELOCITY
-        else:
-            P1_Spear_X -= AOFW.PROJECTILE_VELOCITY
-        P1_Collision = checkForHorizontalCollisions(P1_Spear_X)
-        P1_Hit = checkForProjectileCollision(Player2, P1_Spear)
-        P1_Spear = GameSprite(fr'{AOFW.P1.spriteObject["Action"]["Weapon"]["imagePath"]}/{AOFW.P1.weapon_frame}.png',
-                        (P1_Spear_X, P1_Spear_Y), AOFW.Projectile_Smoothscale_Dimensions, not P1_Inverted)
-        if P1_Hit == True:
-            pygame.mixer.Channel(3).set_volume(0.05)
-            pygame.mixer.Channel(3).play(pygame.mixer.Sound('fight_sounds/knife-slice-cut.mp3'))
-            AOFW.P2.Hurt = True
-            if AOFW.right_health > 0:
-                AOFW.right_health -= 3
-            AOFW.P1.Projectile = False
-
-            if AOFW.right_health <= 0:
-                ## So that the health doesn't show as negative
-                if AOFW.right_health < 0:
-                    AOFW.right_health = 0
-                AOFW.P2.Dead = True
-                pygame.mixer.Channel(4).set_volume(0.1)
-                pygame.mixer.Channel(4).play(pygame.mixer.Sound('fight_sounds/sword-slide-fight.wav'))
-                pygame.mixer.music.pause()
-                pygame.mixer.Channel(5).set_volume(0.05)
-                pygame.mixer.Channel(5).play(pygame.mixer.Sound('fight_sounds/medieval-fanfare.mp3'))
-        if P1_Collision == False:
-            P1_Spear.draw()
-            if AOFW.P1.weapon_frame < AOFW.P1.weapon_frameCount - 2:
-                AOFW.P1.weapon_frame += 1
-            else:
-                AOFW.P1.weapon_frame = 0
-        else:
-            AOFW.P1.Projectile = False
-
-    ## Animation of Player 2's projectiles
-    if AOFW.P2.Projectile == True:
-        if P2_Inverted == True:
-            P2_Spear_X -= AOFW.PROJECTILE_VELOCITY
-        else:
-            P2_Spear_X += AOFW.PROJECTILE_VELOCITY
-        P2_Collision = checkForHorizontalCollisions(P2_Spear_X)
-        P2_Hit = checkForProjectileCollision(Player1, P2_Spear)
-        P2_Spear = GameSprite(fr'{AOFW.P2.spriteObject["Action"]["Weapon"]["imagePath"]}/{AOFW.P2.weapon_frame}.png',
-                        (P2_Spear_X, P2_Spear_Y), AOFW.Projectile_Smoothscale_Dimensions, not P2_Inverted)
-        if P2_Hit == True:
-            pygame.mixer.Channel(3).set_volume(0.1)
-            pygame.mixer.Channel(3).play(pygame.mixer.Sound('fight_sounds/knife-slice-cut.mp3'))
-            AOFW.P1.Hurt = True
-            
-            if AOFW.left_health > 0:
-                AOFW.left_health -= 3
-            AOFW.P2.Projectile = False
-
-            if AOFW.left_health <= 0:
-                ## So that the health doesn't show as negative
-                if AOFW.left_health < 0:
-                    AOFW.left_health = 0
-                AOFW.P1.Dead = True
-                pygame.mixer.Channel(4).set_volume(0.05)
-                pygame.mixer.Channel(4).play(pygame.mixer.Sound('fight_sounds/sword-slide-fight.wav'))
-                pygame.mixer.music.pause()
-                pygame.mixer.Channel(5).set_volume(0.03)
-                pygame.mixer.Channel(5).play(pygame.mixer.Sound('fight_sounds/medieval-fanfare.mp3'))
-        if P2_Collision == False:
-            P2_Spear.draw()
-            if AOFW.P2.weapon_frame < AOFW.P2.weapon_frameCount - 2:
-                AOFW.P2.weapon_frame += 1
-            else:
-                AOFW.P2.weapon_frame = 0
-        else:
-            AOFW.P2.Projectile = False
-
-    tick += 1
-
-    pygame.display.flip()
+    ## Run the game loop
+    record = InputLog(args.hz, AOFW.seed) if args.record else None
+    session = None
+    if args.netplay:
+        host, port = args.peer.rsplit(":", 1)
+        transport = UDPTransport(args.port, (host, int(port)))
+        session = RollbackSession(AOFW, args.netplay - 1, transport, args.input_delay, args.max_rollback)
+    start = time.perf_counter()
+    AOFW.run(args.hz, args.headless, args.ticks, record, replay, args.frames, session)
+    seconds = time.perf_counter() - start
+
+    if session is not None:
+        pprint.pprint(session.metrics(), sort_dicts=False)
+
+    if args.profile:
+        AOFW.profiler.writeCSV(args.profile)
+        print("\n".join(AOFW.profiler.summary()))
+        print(f'wrote {len(AOFW.profiler)} frames to {args.profile}')
+
+    if record is not None:
+        record.save(args.record)
+        print(f'recorded {len(record)} ticks to {args.record}')
+    if replay is not None:
+        result = "matches" if AOFW.stateDigest() == replay.digest else "DIFFERS from"
+        print(f'replayed {AOFW.ticks} ticks in {seconds:.2f}s ({seconds / max(AOFW.ticks, 1) * 1000:.3f} ms per tick), '
+              f'final state {result} the recording')
 ###################################################################################################
-
-
@@ -0,0 +1,120 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import csv
+import time
+from array import array
+from collections import deque
+import pygame
+
+"""
+    Times every phase of a game frame
+
+    GameController calls mark(phase) as it finishes each part of the frame and
+    the time since the last mark goes to that phase. A frame that runs several
+    simulation ticks adds every tick's time to the same phases. endFrame() keeps
+    the frame's times, the last WINDOW frames give the rolling p50/p95/p99 and
+    every frame goes to the CSV.
+
+    A profiler made with enabled=False is what the game uses when nobody asked
+    for profiling, every call on it returns straight away.
+"""
+class FrameProfiler:
+
+    ## In the order they happen in a frame
+    PHASES = ["events", "input", "idle", "animation", "projectiles", "background", "hud", "sprites", "overlay", "flip"]
+
+    ## Numbers counted each frame rather than timed
+    COUNTERS = ["blit_bytes"]
+
+    ## Frames the rolling percentiles are taken over
+    WINDOW = 600
+
+    ## Frames between redrawing the overlay text
+    OVERLAY_EVERY = 30
+
+    def __init__(self, enabled=True, overlay=False):
+        self.enabled = enabled
+        self.overlay = overlay
+        self.current = dict.fromkeys(self.PHASES + self.COUNTERS, 0.0)
+        self.recent = {phase: deque(maxlen=self.WINDOW) for phase in self.PHASES + ["total"] + self.COUNTERS}
+        self.frames = {phase: array("d") for phase in self.PHASES + ["total"] + self.COUNTERS}
+        self.frameStart = self.last = time.perf_counter()
+        self.overlayLines = []
+        self.font = None
+
+    def __len__(self):
+        return len(self.frames["total"])
+
+    def begin(self):
+        if not self.enabled:
+            return
+        self.frameStart = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def count(self, counter, value):
+        if not self.enabled:
+            return
+        self.current[counter] += value
+
+    def endFrame(self):
+        if not self.enabled:
+            return
+        for phase in self.PHASES + self.COUNTERS:
+            self.recent[phase].append(self.current[phase])
+            self.frames[phase].append(self.current[phase])
+            self.current[phase] = 0.0
+        total = self.last - self.frameStart
+        self.recent["total"].append(total)
+        self.frames["total"].append(total)
+
+    ## (p50, p95, p99) over the last WINDOW frames, phases are in milliseconds
+    def percentiles(self, phase, scale=1000):
+        times = sorted(self.recent[phase])
+        if not times:
+            return (0.0, 0.0, 0.0)
+        return tuple(times[min(len(times) - 1, int(len(times) * p))] * scale for p in (0.50, 0.95, 0.99))
+
+    def summary(self):
+        lines = [f'{"phase":<12}{"p50":>8}{"p95":>8}{"p99":>8}  ms over {len(self.recent["total"])} frames']
+        for phase in self.PHASES + ["total"]:
+            p50, p95, p99 = self.percentiles(phase)
+            lines.append(f'{phase:<12}{p50:>8.3f}{p95:>8.3f}{p99:>8.3f}')
+        for counter in self.COUNTERS:
+            p50, p95, p99 = self.percentiles(counter, 1 / 1024)
+            lines.append(f'{counter:<12}{p50:>8.0f}{p95:>8.0f}{p99:>8.0f}  KB')
+        return lines
+
+    ## The percentiles in the top left corner, the text is only rendered again every
+    ## OVERLAY_EVERY frames. Returns the rects drawn over
+    def drawOverlay(self, surface):
+        if not self.enabled or not self.overlay:
+            return []
+        if self.font is None:
+            self.font = pygame.font.SysFont('Consolas', 16)
+        if len(self) % self.OVERLAY_EVERY == 0 or not self.overlayLines:
+            self.overlayLines = [self.font.render(line, True, (255, 255, 255), (0, 0, 0)) for line in self.summary()]
+        rects = []
+        y = 50
+        for line in self.overlayLines:
+            rects.append(surface.blit(line, (10, y)))
+            y += line.get_height()
+        return rects
+
+    ## One row per frame, every phase in milliseconds then the counters
+    def writeCSV(self, path):
+        columns = self.PHASES + ["total"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f'{phase}_ms' for phase in columns] + self.COUNTERS)
+            for i in range(len(self)):
+                writer.writerow([i] + [f'{self.frames[phase][i] * 1000:.4f}' for phase in columns]
+                                + [int(self.frames[counter][i]) for counter in self.COUNTERS])
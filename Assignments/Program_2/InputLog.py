@@ -0,0 +1,101 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import struct
+import sys
+from array import array
+import pygame
+
+"""
+    Records what both players pressed on every simulation tick so a game
+    can be played back exactly, tick for tick, without a window
+
+    Together with the seed PlayerSelector picked the knights with and the
+    tick rate, the key states are everything the simulation reads, so a
+    replay ends in the same state as the game it was recorded from. The
+    recording keeps GameController.stateDigest() from the end of the game
+    and the replay checks it got the same one.
+
+    File layout, little endian:
+        header    b"AOWI", version, tick rate, seed, tick count, digest
+        ticks     one uint16 per tick, a bit for each key in KEYS plus RESET
+"""
+
+## Every key the game reads, the bit for a key is 1 << its index
+KEYS = [pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_LSHIFT,
+        pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_RSHIFT]
+BITS = {key: 1 << i for i, key in enumerate(KEYS)}
+
+## The reset button was clicked before this tick
+RESET = 1 << len(KEYS)
+
+MAGIC = b"AOWI"
+VERSION = 1
+HEADER = struct.Struct("<4sBHIII")
+
+## The seed is stored as a uint32
+MAX_SEED = 2**32 - 1
+
+
+## A recorded tick's keys, indexed the same way as pygame.key.get_pressed()
+class KeyState:
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & BITS.get(key, 0))
+
+
+class InputLog:
+
+    def __init__(self, hz, seed):
+        ## Checked here rather than when the log is saved so a recording is never lost to a bad seed
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"seed {seed} doesn't fit an input log, it must be 0 to {MAX_SEED}")
+        self.hz = hz
+        self.seed = seed
+        self.ticks = array("H")
+        self.digest = 0
+
+    def __len__(self):
+        return len(self.ticks)
+
+    ## Appends one tick, keys is anything indexed like pygame.key.get_pressed()
+    def record(self, keys, reset=False):
+        mask = RESET if reset else 0
+        for key, bit in BITS.items():
+            if keys[key]:
+                mask |= bit
+        self.ticks.append(mask)
+        return KeyState(mask)
+
+    ## (keys, reset) for a recorded tick
+    def keys(self, tick):
+        mask = self.ticks[tick]
+        return KeyState(mask), bool(mask & RESET)
+
+    def save(self, path):
+        ticks = array("H", self.ticks)
+        if sys.byteorder == "big":
+            ticks.byteswap()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.hz, self.seed, len(ticks), self.digest))
+            f.write(ticks.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, hz, seed, count, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an Art of War input log")
+        log = cls(hz, seed)
+        log.digest = digest
+        log.ticks.frombytes(data[HEADER.size:HEADER.size + count * 2])
+        if sys.byteorder == "big":
+            log.ticks.byteswap()
+        if len(log.ticks) != count:
+            raise ValueError(f"{path} ends after {len(log.ticks)} of {count} ticks")
+        return log
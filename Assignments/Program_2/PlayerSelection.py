@@ -6,7 +6,8 @@
 import copy
 import os
 import pprint
-from random import shuffle
+from random import Random, shuffle
+from SpritePack import loadManifest
 
 """
     Object definition to hold sprite information
@@ -66,14 +67,20 @@ characterSprite = {
 ## To be used for pseudo-random character selection
 class PlayerSelector:
 
-    def __init__ (self):
+    def __init__ (self, usePack=True):
         self.characters = ["Knight1", "Knight2", "Knight3"]
         self.warriorNames = ["A Holy Crusader Knight", "A Knight from the Feudalism Era", "A Roman Gladiator"]
         self.characterSprites = []
 
+        ## Built by `python SpritePack.py`, without it the sprite folders are walked
+        self.manifest = loadManifest() if usePack else None
+
         self.loadCharacters()
 
     def loadCharacters(self):
+        if self.manifest is not None:
+            self.loadPacked()
+            return
         for i in range(len(self.characters)):
             characterSprite["Name"] = self.characters[i]
             characterSprite["Screen Name"] = self.warriorNames[i]
@@ -97,12 +104,28 @@ class PlayerSelector:
             characterSprite["Action"]["bloodSplatter"]["frameCount"] = len(os.listdir(characterSprite["Action"]["bloodSplatter"]["imagePath"]))
             self.characterSprites.append(copy.deepcopy(characterSprite))
 
+    ## Same sprite objects as loadCharacters but read from the manifest without
+    ## listing any folders, "Pack" tells AnimationAtlas where the packed frames are
+    def loadPacked(self):
+        for entry in self.manifest["characters"]:
+            sprite = copy.deepcopy(characterSprite)
+            sprite["Name"] = entry["Name"]
+            sprite["Screen Name"] = entry["Screen Name"]
+            for action, info in entry["Action"].items():
+                sprite["Action"][action] = dict(info)
+            sprite["Pack"] = {"image": entry["image"], "frames": entry["frames"]}
+            self.characterSprites.append(sprite)
+
     def sanityCheck(self):
         pp = pprint.PrettyPrinter(depth=4)
         pp.pprint(self.characterSprites)
 
-    def chooseSprites(self):
-        shuffle(self.characterSprites)
+    ## The same seed always picks the same two knights, recorded games rely on it
+    def chooseSprites(self, seed=None):
+        if seed is None:
+            shuffle(self.characterSprites)
+        else:
+            Random(seed).shuffle(self.characterSprites)
         selection = []
         selection.append(self.characterSprites[0])
         selection.append(self.characterSprites[1])
@@ -0,0 +1,161 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import math
+import pygame
+from AnimationAtlas import AnimationAtlas
+
+"""
+    Every spear in the air
+
+    A fixed number of Projectile records is made up front and reused. A throw
+    takes a free record and a spear that hits a player or leaves the arena
+    hands it back, so throwing allocates nothing while playing. A record only
+    holds where the spear is and which frame it shows, the (image, mask)
+    frames are shared out of the thrower's AnimationAtlas.
+"""
+
+## Pixels between the mask tests along a projectile's path
+SWEEP_STEP = 10
+
+
+class Projectile:
+    def __init__(self):
+        self.thrower = None
+        self.target = None
+        self.X = 0
+        self.Y = 0
+        self.previous_X = 0
+        self.direction = 1
+        self.frame = 0
+        self.inverted = False
+        self.image = None
+        self.mask = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+
+class ProjectilePool:
+
+    def __init__(self, capacity, perPlayer, size, outOfBounds):
+        self.records = [Projectile() for i in range(capacity)]
+        self.free = list(reversed(self.records))
+        self.active = []
+        self.hits = []
+        self.perPlayer = perPlayer
+        self.size = size
+
+        ## checkForHorizontalCollisions, a spear past the arena edge is put back in the pool
+        self.outOfBounds = outOfBounds
+
+    def inFlight(self, thrower):
+        return sum(1 for p in self.active if p.thrower is thrower)
+
+    ## Returns the thrown Projectile or None when the pool or the thrower's share of it is used up
+    def throw(self, thrower, target, imgLink, inverted):
+        if not self.free or self.inFlight(thrower) >= self.perPlayer:
+            return None
+        p = self.free.pop()
+        p.thrower = thrower
+        p.target = target
+        p.X = p.previous_X = thrower.player_X
+        p.Y = thrower.player_Y
+        ## A spear keeps flying the way the thrower faced when it left their hand
+        p.direction = -1 if inverted else 1
+        p.inverted = not inverted
+        p.frame = 0
+        p.image, p.mask = AnimationAtlas.image(imgLink, self.size, False)
+        p.rect.size = p.image.get_size()
+        p.rect.center = (p.X, p.Y)
+        self.active.append(p)
+        return p
+
+    def release(self, p):
+        p.thrower = p.target = None
+        self.free.append(p)
+
+    def clear(self):
+        for p in self.active:
+            self.release(p)
+        self.active.clear()
+
+    ## Every spear in the air and where it is, for rollback
+    def saveState(self):
+        return tuple([(p, p.thrower, p.target, p.X, p.Y, p.previous_X, p.direction, p.frame, p.inverted, p.image, p.mask)
+                      for p in self.active])
+
+    def loadState(self, state):
+        self.active = []
+        for saved in state:
+            p = saved[0]
+            p.thrower, p.target, p.X, p.Y, p.previous_X, p.direction, p.frame, p.inverted, p.image, p.mask = saved[1:]
+            p.rect.size = p.image.get_size()
+            p.rect.center = (p.X, p.Y)
+            self.active.append(p)
+        inUse = set(map(id, self.active))
+        self.free = [p for p in reversed(self.records) if id(p) not in inUse]
+
+    ## One animation frame, the weapon frames loop the same way the single spear's did
+    def animate(self):
+        for p in self.active:
+            if p.frame < p.thrower.weapon_frameCount - 2:
+                p.frame += 1
+            else:
+                p.frame = 0
+
+    """
+        Moves every spear velocity pixels and returns the players hit this tick,
+        once for every spear that hit them. The list is reused so it is only
+        good until the next update
+    """
+    def update(self, velocity):
+        self.hits.clear()
+        keep = 0
+        for p in self.active:
+            p.previous_X = p.X
+            p.X += velocity * p.direction
+            p.image, p.mask = p.thrower.atlas.frame("Weapon", p.frame, self.size, p.inverted)
+            p.rect.center = (p.X, p.Y)
+            if self.checkForHit(p, p.target):
+                self.hits.append(p.target)
+                self.release(p)
+            elif self.outOfBounds(p.X):
+                self.release(p)
+            else:
+                self.active[keep] = p
+                keep += 1
+        del self.active[keep:]
+        return self.hits
+
+    """
+        Swept hit test over everywhere the spear was this tick so a fast one
+        can't pass through a player between two ticks. The rect around the
+        whole path is checked first, nearly every spear misses there and
+        never gets to the mask tests
+    """
+    def checkForHit(self, p, target):
+        if target.sprite is None:
+            return False
+        targetRect = target.sprite.playerMain.rect
+        distance = int(p.X - p.previous_X)
+        if not p.rect.union(p.rect.move(-distance, 0)).colliderect(targetRect):
+            return False
+        targetMask = target.sprite.playerMain.mask
+        steps = max(1, math.ceil(abs(distance) / SWEEP_STEP))
+        for step in range(steps + 1):
+            back = distance * (steps - step) // steps
+            offset = (p.rect.x - back - targetRect.x, p.rect.y - targetRect.y)
+            if targetMask.overlap(p.mask, offset) != None:
+                return True
+        return False
+
+    ## alpha is how far the renderer is between the last tick (0) and the current one (1),
+    ## scale is the render scale surface is drawn at. Returns the rects drawn over
+    def draw(self, surface, alpha=1.0, scale=1.0):
+        blits = []
+        for p in self.active:
+            image = AnimationAtlas.drawn(p.image, scale)
+            blits.append((image, image.get_rect(center = ((p.previous_X + (p.X - p.previous_X) * alpha) * scale,
+                                                          p.Y * scale))))
+        return surface.blits(blits)
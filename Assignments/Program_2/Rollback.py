@@ -0,0 +1,326 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import argparse
+import random
+import socket
+import struct
+import sys
+import time
+from array import array
+from InputLog import BITS, KEYS, KeyState
+
+"""
+    Rollback netplay for two machines
+
+    Each machine runs the whole simulation and only sends its own player's
+    keys. A tick never waits for the other machine: when its keys for the
+    tick haven't arrived the session guesses they're the same as the last
+    ones that did and carries on. When the real keys arrive and differ from
+    the guess, the game is put back to the snapshot from before that tick
+    and every tick since is run again with the right keys. The snapshots
+    are GameController.saveState() tuples, one per tick for the last
+    maxRollback ticks.
+
+        inputDelay    ticks between pressing a key and it taking effect, the
+                      other machine gets that long to hear about it before
+                      it has to guess
+        maxRollback   furthest back a correction can go, when the other
+                      machine is further behind than this the game waits
+
+    A transport is anything with send(bytes) and receive() -> [bytes].
+    LoopbackTransport connects two sessions in one process with made up
+    latency and packet loss, UDPTransport connects two machines.
+"""
+
+## Keys each player presses, on their own machine player 1 uses WASD and
+## left shift and player 2 the arrows and right shift like on one keyboard
+PLAYER_KEYS = [KEYS[:5], KEYS[5:]]
+
+## player, first tick, tick count, then a uint16 of keys for each tick
+PACKET = struct.Struct("<BIB")
+
+## The tick count is a byte, the window is twice maxRollback + inputDelay so they can add up to 127
+MAX_WINDOW = 255
+
+
+class LoopbackTransport:
+
+    def __init__(self, latency, jitter, loss, rng):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = rng
+        self.peer = None
+        self.inbox = []
+        self.clock = 0
+        self.sent = 0
+        self.lost = 0
+
+    ## Two connected ends, latency and jitter are in ticks and loss is the chance a packet is dropped
+    @classmethod
+    def pair(cls, latency=3, jitter=2, loss=0.1, seed=0):
+        rng = random.Random(seed)
+        a = cls(latency, jitter, loss, rng)
+        b = cls(latency, jitter, loss, rng)
+        a.peer, b.peer = b, a
+        return a, b
+
+    def send(self, packet):
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.lost += 1
+            return
+        arrives = self.peer.clock + self.latency + self.rng.randint(0, self.jitter)
+        self.peer.inbox.append((arrives, packet))
+
+    ## Each call is one tick of this end's clock
+    def receive(self):
+        self.clock += 1
+        arrived = [packet for arrives, packet in self.inbox if arrives <= self.clock]
+        self.inbox = [(arrives, packet) for arrives, packet in self.inbox if arrives > self.clock]
+        return arrived
+
+
+class UDPTransport:
+
+    def __init__(self, port, peer):
+        self.peer = peer
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("", port))
+        self.socket.setblocking(False)
+
+    def send(self, packet):
+        self.socket.sendto(packet, self.peer)
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                packet, address = self.socket.recvfrom(1024)
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+            packets.append(packet)
+
+
+class RollbackSession:
+
+    def __init__(self, game, player, transport, inputDelay=2, maxRollback=8):
+        if inputDelay < 0 or maxRollback < 0 or 2 * (maxRollback + inputDelay) > MAX_WINDOW:
+            raise ValueError(f"max rollback {maxRollback} plus input delay {inputDelay} must be 0 to {MAX_WINDOW // 2}")
+        self.game = game
+        self.local = player
+        self.remote = 1 - player
+        self.transport = transport
+        self.inputDelay = inputDelay
+        self.maxRollback = maxRollback
+
+        ## Every packet carries this many ticks of keys, as far back as the other machine could still be
+        ## waiting for, so a lost packet is made up for by the next one
+        self.window = 2 * (maxRollback + inputDelay)
+        self.lastInputTick = inputDelay - 1
+
+        ## Confirmed keys for each player by tick, nobody presses anything before the first delayed tick
+        self.inputs = [{tick: 0 for tick in range(inputDelay)} for i in range(2)]
+        self.lastRemoteTick = inputDelay - 1
+
+        ## The remote keys guessed for ticks that have run without them
+        self.predicted = {}
+        self.snapshots = {}
+        self.rollbackFrom = None
+
+        self.rollbacks = 0
+        self.resimTicks = 0
+        self.maxDepth = 0
+        self.resimSeconds = 0.0
+        self.maxResimSeconds = 0.0
+        self.stalls = 0
+        self.mispredictions = 0
+
+    def localMask(self, keys):
+        mask = 0
+        for key in PLAYER_KEYS[self.local]:
+            if keys[key]:
+                mask |= BITS[key]
+        return mask
+
+    """
+        Takes this machine's keys and runs the next tick, returns False when
+        it had to wait because the other machine is more than maxRollback
+        ticks behind
+    """
+    def advance(self, keys):
+        tick = self.game.ticks
+        target = tick + self.inputDelay
+        ## While waiting the same tick comes round again, its keys are already set
+        if target not in self.inputs[self.local]:
+            self.inputs[self.local][target] = self.localMask(keys)
+            self.lastInputTick = target
+        self.sendInputs()
+        self.poll()
+
+        if tick - self.lastRemoteTick > self.maxRollback:
+            self.stalls += 1
+            return False
+        self.simulate(tick)
+        return True
+
+    ## Reads the other machine's keys and rolls back if any of them weren't what was guessed
+    def poll(self):
+        for packet in self.transport.receive():
+            self.readInputs(packet)
+        if self.rollbackFrom is not None:
+            self.rollback()
+
+    def sendInputs(self):
+        first = max(0, self.lastInputTick - self.window + 1)
+        masks = array("H", [self.inputs[self.local].get(tick, 0) for tick in range(first, self.lastInputTick + 1)])
+        if sys.byteorder == "big":
+            masks.byteswap()
+        self.transport.send(PACKET.pack(self.local, first, len(masks)) + masks.tobytes())
+
+    def readInputs(self, packet):
+        player, first, count = PACKET.unpack_from(packet)
+        if player != self.remote:
+            return
+        masks = array("H")
+        masks.frombytes(packet[PACKET.size:PACKET.size + count * 2])
+        if sys.byteorder == "big":
+            masks.byteswap()
+        for tick, mask in enumerate(masks, first):
+            if tick in self.inputs[self.remote] or tick <= self.lastRemoteTick:
+                continue
+            self.inputs[self.remote][tick] = mask
+            if tick in self.predicted:
+                if self.predicted.pop(tick) != mask:
+                    self.mispredictions += 1
+                    if self.rollbackFrom is None or tick < self.rollbackFrom:
+                        self.rollbackFrom = tick
+        while self.lastRemoteTick + 1 in self.inputs[self.remote]:
+            self.lastRemoteTick += 1
+
+    ## Runs one tick with the confirmed keys or a guess at the remote ones
+    def simulate(self, tick):
+        self.snapshots[tick] = self.game.saveState()
+        self.snapshots.pop(tick - self.maxRollback - 1, None)
+        remote = self.inputs[self.remote].get(tick)
+        if remote is None:
+            ## Guess the other player is still pressing what they last pressed, nothing before the first tick
+            remote = self.inputs[self.remote].get(self.lastRemoteTick, 0)
+            self.predicted[tick] = remote
+        self.game.update(KeyState(self.inputs[self.local][tick] | remote))
+
+        ## Inputs this old can't be rolled back to or asked for again
+        for inputs in self.inputs:
+            inputs.pop(tick - self.maxRollback - self.window, None)
+
+    def rollback(self):
+        start = time.perf_counter()
+        first, last = self.rollbackFrom, self.game.ticks
+        self.rollbackFrom = None
+        self.game.loadState(self.snapshots[first])
+        self.game.muted = True
+        for tick in range(first, last):
+            self.simulate(tick)
+        self.game.muted = False
+        ## A death that was only guessed shouldn't leave the music stopped
+        self.game.syncMusic()
+
+        seconds = time.perf_counter() - start
+        self.rollbacks += 1
+        self.resimTicks += last - first
+        self.maxDepth = max(self.maxDepth, last - first)
+        self.resimSeconds += seconds
+        self.maxResimSeconds = max(self.maxResimSeconds, seconds)
+
+    def metrics(self):
+        return {
+            "rollbacks": self.rollbacks,
+            "mispredictions": self.mispredictions,
+            "average depth": self.resimTicks / self.rollbacks if self.rollbacks else 0,
+            "max depth": self.maxDepth,
+            "average resim ms": self.resimSeconds / self.rollbacks * 1000 if self.rollbacks else 0,
+            "max resim ms": self.maxResimSeconds * 1000,
+            "stalls": self.stalls,
+        }
+
+
+"""
+    Plays a match between two GameControllers in this process over a
+    LoopbackTransport with random keys, then checks both machines ended
+    in the same state as one game run with every tick's real keys
+"""
+def loopbackMatch(ticks, seed, latency, jitter, loss, inputDelay, maxRollback):
+    import pygame
+    from ArtOfWar import GameController, screenWidth, screenHeight
+    pygame.init()
+
+    games = [GameController(screenWidth, screenHeight, seed) for i in range(2)]
+    ends = LoopbackTransport.pair(latency, jitter, loss, seed)
+    sessions = []
+    for player, (game, end) in enumerate(zip(games, ends)):
+        game.loadPlayers()
+        game.headless = True
+        sessions.append(RollbackSession(game, player, end, inputDelay, maxRollback))
+
+    ## Each player holds a random set of their keys for a random number of ticks,
+    ## pressed is every tick's keys for the game run without the network
+    rng = random.Random(seed)
+    held = [KeyState(0), KeyState(0)]
+    pressed = [{}, {}]
+    while any(session.predicted or session.game.ticks < ticks for session in sessions):
+        for player, session in enumerate(sessions):
+            if session.game.ticks >= ticks:
+                ## Done, but the other machine may still need this one's last keys
+                session.sendInputs()
+                session.poll()
+                continue
+            if rng.random() < 0.1:
+                held[player] = {key: rng.random() < 0.3 for key in PLAYER_KEYS[player]}
+            target = session.game.ticks + inputDelay
+            if target not in pressed[player]:
+                pressed[player][target] = session.localMask(held[player])
+            session.advance(held[player])
+
+    offline = GameController(screenWidth, screenHeight, seed)
+    offline.loadPlayers()
+    offline.headless = True
+    for tick in range(ticks):
+        offline.update(KeyState(pressed[0].get(tick, 0) | pressed[1].get(tick, 0)))
+
+    start = time.perf_counter()
+    for i in range(1000):
+        state = offline.saveState()
+    saveMicros = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for i in range(1000):
+        offline.loadState(state)
+    loadMicros = (time.perf_counter() - start) * 1000
+
+    digests = [game.stateDigest() for game in games]
+    print(f'{ticks} ticks, latency {latency}+{jitter} ticks, {ends[0].lost + ends[1].lost} of '
+          f'{ends[0].sent + ends[1].sent} packets lost, input delay {inputDelay}, max rollback {maxRollback}')
+    for player, session in enumerate(sessions):
+        print(f'player {player + 1}: ' + ", ".join(f'{name} {value:.2f}' if isinstance(value, float) else f'{name} {value}'
+                                                  for name, value in session.metrics().items()))
+    print(f'snapshot save {saveMicros:.1f} us, restore {loadMicros:.1f} us')
+    same = digests[0] == digests[1] == offline.stateDigest()
+    print(f'both machines {"match" if same else "DO NOT match"} the game run with the real keys')
+    return same
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play a rollback match over a simulated network")
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--seed", type=int, default=5443)
+    parser.add_argument("--latency", type=int, default=3, help="ticks a packet takes to arrive")
+    parser.add_argument("--jitter", type=int, default=2, help="up to this many extra ticks on top of latency")
+    parser.add_argument("--loss", type=float, default=0.1, help="chance a packet is lost")
+    parser.add_argument("--input-delay", type=int, default=2)
+    parser.add_argument("--max-rollback", type=int, default=8)
+    args = parser.parse_args()
+    if args.input_delay < 0 or args.max_rollback < 0 or args.max_rollback + args.input_delay > MAX_WINDOW // 2:
+        parser.error(f"--max-rollback plus --input-delay must be 0 to {MAX_WINDOW // 2}")
+    loopbackMatch(args.ticks, args.seed, args.latency, args.jitter, args.loss, args.input_delay, args.max_rollback)
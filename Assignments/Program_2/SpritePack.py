@@ -0,0 +1,139 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import argparse
+import json
+import os
+import time
+import pygame
+
+"""
+    Offline build step for the knight sprites
+
+    The frames in Sprites/Knight*/<Action>/ are ~1600x1100 PNGs and decoding
+    them is most of the start up time. This packs every numbered frame,
+    already scaled to the sizes the game draws it at, into one PNG per
+    knight and writes a manifest with each frame's rect and every action's
+    frame count. PlayerSelector reads only the manifest and AnimationAtlas
+    decodes the one packed image for each chosen knight.
+
+        python SpritePack.py            builds Sprites/packed/
+        python SpritePack.py --time     compares cold start with and without the packs
+"""
+
+PACK_DIR = "Sprites/packed"
+MANIFEST = f"{PACK_DIR}/manifest.json"
+
+CHARACTERS = ["Knight1", "Knight2", "Knight3"]
+WARRIOR_NAMES = ["A Holy Crusader Knight", "A Knight from the Feudalism Era", "A Roman Gladiator"]
+ACTIONS = ["Attack", "Die", "Idle", "Jump", "Move", "Hurt", "Weapon", "Blood", "bloodSplatter"]
+
+## The sizes GameController draws at, Default and Crouching for the
+## knight and Projectile for the Weapon frames
+PLAYER_SIZES = [(250, 250), (215, 175)]
+PROJECTILE_SIZE = (150, 50)
+
+## Widest row of frames in a packed image
+PACK_WIDTH = 2048
+
+
+"""
+    Lays frames out left to right in rows (shelf packing), every frame
+    in a row shares the row's top edge and a new row starts when the
+    next frame won't fit in PACK_WIDTH
+"""
+def shelfPack(sizes):
+    rects = []
+    x = y = rowHeight = 0
+    for width, height in sizes:
+        if x + width > PACK_WIDTH:
+            x = 0
+            y += rowHeight
+            rowHeight = 0
+        rects.append((x, y, width, height))
+        x += width
+        rowHeight = max(rowHeight, height)
+    return rects, (PACK_WIDTH, y + rowHeight)
+
+
+def framePaths(imagePath):
+    count = 0
+    while os.path.isfile(f'{imagePath}/{count}.png'):
+        yield count, f'{imagePath}/{count}.png'
+        count += 1
+
+
+def buildPack(character, screenName):
+    entry = {"Name": character, "Screen Name": screenName, "image": f'{PACK_DIR}/{character}.png',
+             "Action": {}, "frames": []}
+    surfaces = []
+    for action in ACTIONS:
+        imagePath = f'Sprites/{character}/{action}'
+        entry["Action"][action] = {"imagePath": imagePath, "frameCount": len(os.listdir(imagePath))}
+        ## bloodSplatter isn't drawn by the game so only its count is kept
+        if action == "bloodSplatter":
+            continue
+        sizes = [PROJECTILE_SIZE] if action == "Weapon" else PLAYER_SIZES
+        for frame, path in framePaths(imagePath):
+            original = pygame.image.load(path)
+            for size in sizes:
+                surfaces.append(pygame.transform.smoothscale(original, size))
+                entry["frames"].append({"action": action, "frame": frame, "size": list(size)})
+
+    rects, packSize = shelfPack([surface.get_size() for surface in surfaces])
+    packed = pygame.Surface(packSize, pygame.SRCALPHA)
+    for surface, rect, frame in zip(surfaces, rects, entry["frames"]):
+        packed.blit(surface, rect[:2])
+        frame["rect"] = list(rect)
+    pygame.image.save(packed, entry["image"])
+    return entry
+
+
+def buildPacks():
+    start = time.perf_counter()
+    os.makedirs(PACK_DIR, exist_ok=True)
+    manifest = {"playerSizes": PLAYER_SIZES, "projectileSize": PROJECTILE_SIZE, "characters": []}
+    for character, screenName in zip(CHARACTERS, WARRIOR_NAMES):
+        manifest["characters"].append(buildPack(character, screenName))
+        print(f'packed {character}: {len(manifest["characters"][-1]["frames"])} frames')
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f)
+    print(f'wrote {MANIFEST} in {time.perf_counter() - start:.1f}s')
+
+
+def loadManifest():
+    if not os.path.isfile(MANIFEST):
+        return None
+    with open(MANIFEST) as f:
+        return json.load(f)
+
+
+"""
+    Times what the game does before the first frame: PlayerSelector and
+    an AnimationAtlas for the two chosen knights, with and without the packs
+"""
+def timeColdStart():
+    from PlayerSelection import PlayerSelector
+    from AnimationAtlas import AnimationAtlas
+    pygame.display.set_mode((1, 1))
+    for packed in (False, True):
+        AnimationAtlas.atlases.clear()
+        start = time.perf_counter()
+        selector = PlayerSelector(usePack=packed)
+        for sprite in selector.chooseSprites():
+            AnimationAtlas.get(sprite, PLAYER_SIZES, PROJECTILE_SIZE)
+        label = "packed" if packed else "folders"
+        print(f'cold start from {label}: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pack the knight sprites into one image per knight")
+    parser.add_argument("--time", action="store_true", help="time cold start with and without the packs")
+    args = parser.parse_args()
+    pygame.init()
+    if args.time:
+        timeColdStart()
+    else:
+        buildPacks()
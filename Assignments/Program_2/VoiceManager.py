@@ -0,0 +1,87 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import pygame
+
+"""
+    Plays the fight sounds
+
+    Every effect is decoded once when the manager is made. An effect won't
+    play again until its cooldown has passed or while it already has as
+    many voices as it's allowed, so holding a key down plays the sound once
+    and lets it finish instead of restarting it every frame. Channels
+    aren't tied to effects: a sound takes a free channel, and when they're
+    all busy it takes the one playing the lowest priority sound, but only
+    if that priority is below its own.
+
+        volume      default volume, play() can give its own
+        priority    higher priority sounds can take a channel from lower ones
+        cooldown    milliseconds before the effect can start again
+        voices      most channels the effect can be playing on at once
+"""
+EFFECTS = {
+    "footsteps": {"path": "fight_sounds/metal-plate.wav", "volume": 0.05, "priority": 1, "cooldown": 250, "voices": 1},
+    "jump": {"path": "fight_sounds/sword-hit-in-battle.wav", "volume": 0.04, "priority": 2, "cooldown": 150, "voices": 2},
+    "throw": {"path": "fight_sounds/fighting-mans-voice.wav", "volume": 0.07, "priority": 2, "cooldown": 150, "voices": 2},
+    "hit": {"path": "fight_sounds/knife-slice-cut.mp3", "volume": 0.05, "priority": 3, "cooldown": 50, "voices": 3},
+    "death": {"path": "fight_sounds/sword-slide-fight.wav", "volume": 0.1, "priority": 4, "cooldown": 0, "voices": 2},
+    "fanfare": {"path": "fight_sounds/medieval-fanfare.mp3", "volume": 0.05, "priority": 5, "cooldown": 0, "voices": 1},
+}
+
+
+class VoiceManager:
+
+    def __init__(self, channels=7, effects=EFFECTS):
+        pygame.mixer.set_num_channels(channels)
+        self.effects = effects
+        self.sounds = {name: pygame.mixer.Sound(effect["path"]) for name, effect in effects.items()}
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+
+        ## The effect each channel was last given, a channel that isn't busy is free whatever it says
+        self.playing = [None] * channels
+        self.lastPlayed = dict.fromkeys(effects, None)
+        self.stats = {"played": 0, "cooldown": 0, "voices": 0, "stolen": 0, "dropped": 0}
+
+    def voices(self, name):
+        return sum(1 for channel, playing in zip(self.channels, self.playing) if playing == name and channel.get_busy())
+
+    ## Returns the channel the sound went to or None when it wasn't played
+    def play(self, name, volume=None):
+        effect = self.effects[name]
+        now = pygame.time.get_ticks()
+        last = self.lastPlayed[name]
+        if last is not None and now - last < effect["cooldown"]:
+            self.stats["cooldown"] += 1
+            return None
+        if self.voices(name) >= effect["voices"]:
+            self.stats["voices"] += 1
+            return None
+
+        index = self.findChannel(effect["priority"])
+        if index is None:
+            self.stats["dropped"] += 1
+            return None
+
+        channel = self.channels[index]
+        channel.set_volume(effect["volume"] if volume is None else volume)
+        channel.play(self.sounds[name])
+        self.playing[index] = name
+        self.lastPlayed[name] = now
+        self.stats["played"] += 1
+        return channel
+
+    ## A free channel, or else the one playing the lowest priority sound below priority
+    def findChannel(self, priority):
+        lowest = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+            playingPriority = self.effects[self.playing[i]]["priority"] if self.playing[i] else 0
+            if playingPriority < priority and (lowest is None or playingPriority < lowest[1]):
+                lowest = (i, playingPriority)
+        if lowest is None:
+            return None
+        self.stats["stolen"] += 1
+        return lowest[0]
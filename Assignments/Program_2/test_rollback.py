@@ -0,0 +1,21 @@
+"""
+    Author:   Byron Dowling, Leslie Cook, Izzy Olaemimimo
+    Class:    5443 2D Python Gaming
+"""
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from Rollback import loopbackMatch
+
+"""
+    Plays short loopback matches and checks both machines end in the same
+    state as the game run with the real keys, run with python -m pytest
+"""
+
+def testLoopbackMatch():
+    assert loopbackMatch(600, 5443, 3, 2, 0.1, 2, 8)
+
+def testLoopbackMatchNoInputDelay():
+    assert loopbackMatch(600, 5443, 3, 2, 0.1, 0, 8)
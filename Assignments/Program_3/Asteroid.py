@@ -1,6 +1,6 @@
 import pygame
 from BaseSprite import BaseSprite
-import Util
+from PrototypeRegistry import PrototypeRegistry
 from pygame.math import Vector2
 import random
 
@@ -51,7 +51,8 @@ class Asteroid():
         self.__scale = scale
         speedMul = 2
         
-        image = pygame.image.load("Environment/Asteroids/Asteroid 01 - Base.png")
+        #shared with every other asteroid this size, only loaded and masked the first time
+        prototype = PrototypeRegistry.image("Environment/Asteroids/Asteroid 01 - Base.png", self.__scale)
         
         if loc == None:
             self.__location = Vector2(random.randrange(0, 700),random.randrange(0, 500))
@@ -59,7 +60,7 @@ class Asteroid():
         else:
             self.__location = loc
         
-        self.__sprite = BaseSprite(image, Util.scale(image.get_size(), self.__scale),loc=self.__location, mask=True)
+        self.__sprite = BaseSprite.fromPrototype(prototype, loc=self.__location, mask=True)
         if vel == None:
             self.__velocity = Vector2(random.uniform(-1,1) * speedMul + 1, random.uniform(-1,1) * speedMul + 1)
         else:
@@ -1,5 +1,6 @@
 import pygame
 import Util
+from RotationCache import RotationCache
 
 class BaseSprite(pygame.sprite.Sprite):
     """
@@ -18,6 +19,12 @@ class BaseSprite(pygame.sprite.Sprite):
         used to make transitions look smoother
     imageHolder :
         needed for rotations
+    __source : pygame.Surface
+        the image before scaling, with __size it is what rotations are cached by
+    __size : tuple
+        the size the image is scaled to
+    rotations : RotationCache
+        rotated images and masks shared by every sprite
     
 
     Methods
@@ -26,6 +33,10 @@ class BaseSprite(pygame.sprite.Sprite):
         draws the sprite
     setImage(img, scale)
         sets the scale of the sprite image
+    fromPrototype(prototype, mask, loc)
+        makes a sprite that shares an already scaled image and mask
+    setPrototype(prototype)
+        sets the sprite image to an already scaled one
     getMask() : 
         gets the collider of the object
     update(cmd, arg, ret) : 
@@ -35,6 +46,8 @@ class BaseSprite(pygame.sprite.Sprite):
         'Move'
         'Collide'
     """
+
+    rotations = RotationCache()
     
     def __init__(self, img, size, mask = False, loc = (0,0)):
         """
@@ -57,6 +70,8 @@ class BaseSprite(pygame.sprite.Sprite):
 
         #needed for rotation
         self.imageHolder = self.image
+        self.__source = img
+        self.__size = size
 
         if mask == True:
             self.__mask = pygame.mask.from_surface(self.image)
@@ -87,9 +102,52 @@ class BaseSprite(pygame.sprite.Sprite):
         img : sprite
         scale : float
         """
-        self.image = pygame.transform.scale(img, Util.scale(img.get_size(), scale))
+        self.__size = Util.scale(img.get_size(), scale)
+        self.image = pygame.transform.scale(img, self.__size)
         self.imageHolder = self.image
+        self.__source = img
         
+    @classmethod
+    def fromPrototype(cls, prototype, mask = False, loc = (0,0)):
+        """
+        Makes a sprite from a Prototype without scaling or masking anything
+
+        Parameters
+        ----------
+        prototype : Prototype
+        mask : bool
+        loc : tuple
+            location of Sprite
+
+        Returns
+        -------
+        BaseSprite
+        """
+        sprite = cls.__new__(cls)
+        pygame.sprite.Sprite.__init__(sprite)
+        sprite.setPrototype(prototype)
+        sprite.rect = sprite.image.get_rect(topleft = loc)
+        sprite.rectBuffer = sprite.image.get_size()[1] / 2
+
+        if mask == True:
+            sprite.__mask = prototype.mask
+        else:
+            sprite.__mask = None
+        return sprite
+
+    def setPrototype(self, prototype):
+        """
+        Sets the sprite image to a Prototype's, which is already scaled
+
+        Parameters
+        ----------
+        prototype : Prototype
+        """
+        self.image = prototype.image
+        self.imageHolder = self.image
+        self.__source = prototype.image
+        self.__size = prototype.size
+
     def update(self, cmd, arg, ret = None):
         """
         Updates sprites according to the cmd arguments 
@@ -104,9 +162,11 @@ class BaseSprite(pygame.sprite.Sprite):
             self.rect.center = arg
         elif cmd == 'Rotate':
             imageRect = self.imageHolder.get_rect(center = self.rect.center)
-            # rotate an image
-            self.image = pygame.transform.rotate(self.imageHolder, arg)
+            # rotated once per image and angle, the mask turns with the image
+            self.image, mask = BaseSprite.rotations.rotate(self.__source, self.__size, self.imageHolder, arg)
             self.rect = self.image.get_rect(center = imageRect.center)
+            if self.__mask != None:
+                self.__mask = mask
         elif cmd == 'Move':
             self.rect.center += arg[0] * arg[2]
             if self.rect.top <= -self.rectBuffer:
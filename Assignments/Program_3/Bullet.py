@@ -1,7 +1,6 @@
 import pygame
-from PIL import Image
 from BaseSprite import BaseSprite
-import Util
+from PrototypeRegistry import PrototypeRegistry
 from pygame.math import Vector2
 
 class Bullet():
@@ -18,8 +17,8 @@ class Bullet():
         max buffer for image looping
     __numFrames : int
         number of frames in the animation
-    __bulletImages : int
-        list of images for the animation
+    __bulletImages : list
+        list of Prototypes for the animation, shared by every bullet
     sprite : pygame.sprite
         sprite for the bullet
     __currentFrame : int
@@ -51,23 +50,12 @@ class Bullet():
         self.imgBuf = 0
         self.bufferMax = 4
         
-        image = Image.open("Ship/Main ship weapons/Main ship weapon - Projectile - Zapper.png")
-        
         self.__numFrames = 4
-        frameSize = (image.size[0]/self.__numFrames, image.size[1])
-        
-        self.__bulletImages = []
         
-        for i in range(self.__numFrames):                
-            #crops to the best size for screen
-            img = image.crop((frameSize[0] * i, 0, frameSize[0] * (i + 1), frameSize[1]))
-            #img.show()
-
-            img = pygame.image.fromstring(img.tobytes(), img.size, img.mode)
-
-            self.__bulletImages.append(img)
+        #loaded, cropped and scaled the first time a bullet is fired
+        self.__bulletImages = PrototypeRegistry.frames("Ship/Main ship weapons/Main ship weapon - Projectile - Zapper.png", self.__numFrames, self.imgMul)
             
-        self.sprite = BaseSprite(self.__bulletImages[0],Util.scale(self.__bulletImages[0].get_size(), self.imgMul),mask = True)
+        self.sprite = BaseSprite.fromPrototype(self.__bulletImages[0], mask = True)
         
         self.__currentFrame = 0
         # *6 so there are 6 intermediate angeles to shoot from per section of 90 degrees
@@ -83,7 +71,7 @@ class Bullet():
         ----------
             screen : pygame.display
         """
-        self.sprite.setImage(self.__bulletImages[self.__currentFrame],self.imgMul)
+        self.sprite.setPrototype(self.__bulletImages[self.__currentFrame])
         if self.imgBuf == self.bufferMax:
             self.imgBuf = 0
             
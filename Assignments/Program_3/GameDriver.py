@@ -7,6 +7,8 @@ from Ship import Ship
 from Asteroid import Asteroid
 from HealthBar import HealthBar
 from Scores import Scores 
+from BaseSprite import BaseSprite
+from TintCache import TintCache
 
 class GameDriver:
     """
@@ -148,6 +150,9 @@ class GameDriver:
 
             self.__delta = self.__clock.tick(self.__fps) / self.__fps
 
+        print(BaseSprite.rotations.report())
+        print(TintCache.report())
+
     def __Draw(self):
         """
         Draws the pygame display with the background, ships, asteroids
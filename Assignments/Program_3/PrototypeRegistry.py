@@ -0,0 +1,117 @@
+import pygame
+import Util
+
+class Prototype():
+    """
+    A class to represent one loaded, cropped and scaled frame that every
+    sprite made from it shares
+    ...
+
+    The image and mask are never changed, sprites only point at them.
+
+    Attributes
+    ----------
+    image : pygame.Surface
+        the frame at its scaled size
+    mask : pygame.mask
+        the collision mask of the scaled frame
+    size : tuple
+        the size of the scaled frame
+    """
+    def __init__(self, image):
+        """
+        Parameters
+        ----------
+        image : pygame.Surface
+            the scaled frame
+        """
+        self.image = image
+        self.mask = pygame.mask.from_surface(image)
+        self.size = image.get_size()
+
+
+class PrototypeRegistry():
+    """
+    A class to load sprite frames once for the whole game
+    ...
+
+    The first time an (asset, frames, scale) is asked for the image is
+    loaded, cut into frames, scaled and masked. After that every call
+    gets the same Prototypes back, so making a Bullet or an Asteroid
+    doesn't open a file or touch a pixel.
+
+    Attributes
+    ----------
+    __prototypes : dict
+        the list of Prototypes for each (path, numFrames, scale)
+    loads : int
+        times an asset was loaded from disk
+    hits : int
+        times an asset was already loaded
+
+    Methods
+    -------
+    frames(path, numFrames, scale)
+        gets the Prototypes for each frame of a sprite sheet
+    image(path, scale)
+        gets the Prototype for a single image
+    """
+    __prototypes = {}
+    loads = 0
+    hits = 0
+
+    @classmethod
+    def frames(cls, path, numFrames, scale):
+        """
+        Gets the frames of a sprite sheet laid out left to right
+
+        Parameters
+        ----------
+        path : string
+        numFrames : int
+            the sheet is cut into this many frames of the same width
+        scale : float
+
+        Returns
+        -------
+        list
+            a Prototype for each frame
+        """
+        key = (path, numFrames, scale)
+        if key in cls.__prototypes:
+            cls.hits += 1
+            return cls.__prototypes[key]
+
+        cls.loads += 1
+        sheet = pygame.image.load(path)
+        frameSize = (sheet.get_width() / numFrames, sheet.get_height())
+        prototypes = []
+
+        for i in range(numFrames):
+            #same boundaries PIL's crop rounds a fractional frame width to
+            left = round(frameSize[0] * i)
+            frame = sheet.subsurface((left, 0, round(frameSize[0] * (i + 1)) - left, frameSize[1]))
+            frame = pygame.transform.scale(frame, Util.scale(frame.get_size(), scale))
+            # in the screen's pixel format so drawing it is a straight copy
+            if pygame.display.get_surface() != None:
+                frame = frame.convert_alpha()
+            prototypes.append(Prototype(frame))
+
+        cls.__prototypes[key] = prototypes
+        return prototypes
+
+    @classmethod
+    def image(cls, path, scale):
+        """
+        Gets a single image
+
+        Parameters
+        ----------
+        path : string
+        scale : float
+
+        Returns
+        -------
+        Prototype
+        """
+        return cls.frames(path, 1, scale)[0]
@@ -0,0 +1,131 @@
+import pygame
+from collections import OrderedDict
+
+class RotationCache():
+    """
+    A class to keep rotated sprite images so they are only rotated once
+    ...
+
+    Angles are rounded to the nearest step degrees, ships only turn in
+    3 degree steps so a ship and its bullets never need more than 120
+    rotations of each image. The least recently used rotation is dropped
+    when the cache is full.
+
+    Attributes
+    ----------
+    __step : float
+        the angles are rounded to a multiple of this many degrees
+    __maxSize : int
+        the most rotations kept
+    __rotations : OrderedDict
+        (image, mask) for each (source image, size, angle), oldest first
+    hits : int
+        rotations found in the cache
+    misses : int
+        rotations that had to be made
+
+    Methods
+    -------
+    quantize(angle)
+        rounds an angle to the step
+    rotate(source, size, image, angle)
+        gets the rotated image and mask
+    hitRate()
+        the fraction of rotations found in the cache
+    report()
+        the cache stats as a string
+    """
+    def __init__(self, step = 3, maxSize = 1024):
+        """
+        Parameters
+        ----------
+        step : float, optional
+            Defaults to 3
+        maxSize : int, optional
+            Defaults to 1024
+        """
+        self.__step = step
+        self.__maxSize = maxSize
+        self.__rotations = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.__rotations)
+
+    def quantize(self, angle):
+        """
+        Rounds an angle to the nearest step
+
+        Parameters
+        ----------
+        angle : float
+
+        Returns
+        -------
+        float
+            between 0 and 360
+        """
+        return round(angle / self.__step) * self.__step % 360
+
+    def rotate(self, source, size, image, angle):
+        """
+        Gets the image rotated to angle and its mask
+
+        Parameters
+        ----------
+        source : pygame.Surface
+            the image before it was scaled, part of the key
+        size : tuple
+            the size it was scaled to, part of the key
+        image : pygame.Surface
+            source already scaled to size, only rotated when it isn't in the cache
+        angle : float
+
+        Returns
+        -------
+        tuple
+            (pygame.Surface, pygame.mask)
+        """
+        key = (source, size, self.quantize(angle))
+        rotation = self.__rotations.get(key)
+
+        if rotation != None:
+            self.hits += 1
+            self.__rotations.move_to_end(key)
+            return rotation
+
+        self.misses += 1
+        rotated = pygame.transform.rotate(image, key[2])
+        # in the screen's pixel format so drawing it every frame is a straight copy
+        if pygame.display.get_surface() != None:
+            rotated = rotated.convert_alpha()
+        rotation = (rotated, pygame.mask.from_surface(rotated))
+        self.__rotations[key] = rotation
+
+        if len(self.__rotations) > self.__maxSize:
+            self.__rotations.popitem(last = False)
+
+        return rotation
+
+    def hitRate(self):
+        """
+        Gets the fraction of rotations found in the cache
+
+        Returns
+        -------
+        float
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        """
+        Gets the cache stats
+
+        Returns
+        -------
+        string
+        """
+        return (f"rotation cache: {self.hits} hits, {self.misses} misses, {self.hitRate():.1%} hit rate, "
+                f"{len(self.__rotations)} of {self.__maxSize} rotations kept")
@@ -3,6 +3,7 @@ from pygame.math import Vector2
 from PIL import Image
 from BaseSprite import BaseSprite
 from Bullet import Bullet
+from TintCache import TintCache
 from copy import deepcopy
 import Util
 
@@ -25,7 +26,7 @@ class Ship:
     __color : tuple
         the color of the ship
     __bodyStates : list
-        the list of body states of the ship
+        the list of body states of the ship, tinted to its color and shared with ships the same color
     __body : BaseSprite
         the body of the ship
     __expStates : list
@@ -176,30 +177,16 @@ class Ship:
         self.__bodyStates = []
         self.__color = Colors[player]
         
-        self.__bodyStates.append(Image.open(
-            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Full health.png'))
-        self.__bodyStates.append(Image.open(
-            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Slight damage.png'))
-        self.__bodyStates.append(Image.open(
-            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Damaged.png'))
-        self.__bodyStates.append(Image.open(
-            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Very damaged.png'))
-        
-        for i in range(len(self.__bodyStates)):
-            image = self.__bodyStates[i].convert("RGBA")
-            imageData = image.getdata()
-            new_image_data = []
-            
-            for item in imageData:
-                # change all white (also shades of whites) pixels to yellow
-                if item[0] in list(range(190, 256)):
-                    new_image_data.append(self.__color)
-                else:
-                    new_image_data.append(item)
-                    
-            # update image data
-            image.putdata(new_image_data)
-            self.__bodyStates[i] = pygame.image.fromstring(image.tobytes(), image.size, image.mode)
+        # change all white (also shades of whites) pixels to the ship's color,
+        # each color is only done once and saved for the next game
+        self.__bodyStates.append(TintCache.tint(
+            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Full health.png', self.__color))
+        self.__bodyStates.append(TintCache.tint(
+            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Slight damage.png', self.__color))
+        self.__bodyStates.append(TintCache.tint(
+            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Damaged.png', self.__color))
+        self.__bodyStates.append(TintCache.tint(
+            'Ship/Main Ship/Main Ship - Bases/Main Ship - Base - Very damaged.png', self.__color))
 
         self.__body = BaseSprite(self.__bodyStates[0], Util.scale(self.__bodyStates[0].get_size(), self.__imageMul), mask=True)
         
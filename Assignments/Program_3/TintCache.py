@@ -0,0 +1,172 @@
+import hashlib
+import os
+import pygame
+
+class TintCache():
+    """
+    A class to recolour the ship images once per colour
+    ...
+
+    A tinted image is kept for the rest of the game and saved to
+    CACHE_DIR, named by a hash of the source file and the colour, so the
+    next game loads it instead of recolouring it. Every ship of the same
+    colour shares the same surface. Editing a source image changes its
+    hash so the old tinted copies are never used for it.
+
+    Attributes
+    ----------
+    CACHE_DIR : string
+        where the tinted images are saved
+    __tinted : dict
+        the tinted image for each (path, color)
+    __hashes : dict
+        the hash of each source file already read
+    memoryHits : int
+        tints that were already made this game
+    diskHits : int
+        tints loaded from CACHE_DIR
+    misses : int
+        tints that had to be recoloured
+
+    Methods
+    -------
+    tint(path, color)
+        gets the image at path with its whites changed to color
+    save(image, cachePath)
+        saves a tinted image to the cache
+    fileHash(path)
+        gets the hash of a source file
+    recolor(image, color)
+        changes the whites in an image to color
+    report()
+        the cache stats as a string
+    """
+    CACHE_DIR = 'Cache/Tinted'
+    __tinted = {}
+    __hashes = {}
+    memoryHits = 0
+    diskHits = 0
+    misses = 0
+
+    @classmethod
+    def tint(cls, path, color):
+        """
+        Gets the image at path with its white pixels changed to color
+
+        Parameters
+        ----------
+        path : string
+        color : tuple
+            (R,G,B)
+
+        Returns
+        -------
+        pygame.Surface
+            shared with every other ship this color, it must not be drawn on
+        """
+        key = (path, tuple(color))
+        if key in cls.__tinted:
+            cls.memoryHits += 1
+            return cls.__tinted[key]
+
+        cachePath = os.path.join(cls.CACHE_DIR, f"{cls.fileHash(path)}-{color[0]}-{color[1]}-{color[2]}.png")
+
+        image = None
+        if os.path.isfile(cachePath):
+            try:
+                image = pygame.image.load(cachePath)
+                cls.diskHits += 1
+            except pygame.error:
+                #a broken cache file is recoloured and written again
+                image = None
+
+        if image == None:
+            cls.misses += 1
+            image = cls.recolor(pygame.image.load(path), color)
+            cls.save(image, cachePath)
+
+        cls.__tinted[key] = image
+        return image
+
+    @classmethod
+    def save(cls, image, cachePath):
+        """
+        Saves a tinted image to the cache, it is written to a temporary file
+        first and then renamed so the cache never holds a half written image
+
+        Parameters
+        ----------
+        image : pygame.Surface
+        cachePath : string
+        """
+        #ends in .png so pygame saves it as a png, the process id keeps two games from sharing it
+        tempPath = f"{cachePath[:-len('.png')]}.{os.getpid()}.tmp.png"
+        try:
+            os.makedirs(cls.CACHE_DIR, exist_ok = True)
+            pygame.image.save(image, tempPath)
+            os.replace(tempPath, cachePath)
+        except (OSError, pygame.error):
+            #the game still works without the cache, it just recolours again next time
+            if os.path.isfile(tempPath):
+                os.remove(tempPath)
+
+    @classmethod
+    def fileHash(cls, path):
+        """
+        Gets the hash of a source file, each file is only read once
+
+        Parameters
+        ----------
+        path : string
+
+        Returns
+        -------
+        string
+        """
+        if path not in cls.__hashes:
+            with open(path, 'rb') as f:
+                cls.__hashes[path] = hashlib.sha1(f.read()).hexdigest()[:16]
+        return cls.__hashes[path]
+
+    @staticmethod
+    def recolor(image, color):
+        """
+        Changes all white (also shades of white) pixels to color, the
+        whole image at once instead of a pixel at a time
+
+        Parameters
+        ----------
+        image : pygame.Surface
+        color : tuple
+            (R,G,B)
+
+        Returns
+        -------
+        pygame.Surface
+        """
+        rgb = pygame.surfarray.array3d(image)
+        alpha = pygame.surfarray.array_alpha(image)
+
+        # red from 190 to 255 is what counts as white, it becomes color and fully opaque
+        white = rgb[:, :, 0] >= 190
+        rgb[white] = color[:3]
+        alpha[white] = 255
+
+        tinted = pygame.Surface(image.get_size(), pygame.SRCALPHA, 32)
+        pygame.surfarray.blit_array(tinted, rgb)
+        pixelsAlpha = pygame.surfarray.pixels_alpha(tinted)
+        pixelsAlpha[:] = alpha
+        del pixelsAlpha
+        return tinted
+
+    @classmethod
+    def report(cls):
+        """
+        Gets the cache stats
+
+        Returns
+        -------
+        string
+        """
+        return (f"tint cache: {cls.memoryHits} shared, {cls.diskHits} loaded from {cls.CACHE_DIR}, "
+                f"{cls.misses} recoloured")